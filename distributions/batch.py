@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from distributions.models import Formula
+from distributions.core import ADJUSTED_MAD_SCALE
+
+STATS = ['median', 'q1', 'q3', 'mean', 'adjusted_mad', 'mad', 'iqr', 'sd']
+
+
+def get_stats_matrix(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """
+    Calculate the statistics used by the outlier detection formulas for every distribution of a 2-D array at once.
+    :param values: 2-D array, each distribution being laid along axis.
+    :param axis: Axis along which the distributions are laid.
+    :return: Array of shape (number of distributions, len(STATS)) with the statistics in the order of STATS.
+    """
+    values = np.asarray(values, dtype=float)
+    if np.isnan(values).any():
+        median_func, percentile_func, mean_func, std_func = np.nanmedian, np.nanpercentile, np.nanmean, np.nanstd
+    else:
+        median_func, percentile_func, mean_func, std_func = np.median, np.percentile, np.mean, np.std
+
+    median = median_func(values, axis=axis)
+    q1, q3 = percentile_func(values, [25, 75], axis=axis)
+    raw_mad = median_func(np.abs(values - np.expand_dims(median, axis)), axis=axis)
+    mean = mean_func(values, axis=axis)
+    sd = std_func(values, axis=axis, ddof=1)
+    return np.stack([median, q1, q3, mean, raw_mad * ADJUSTED_MAD_SCALE, raw_mad * 1.4826, q3 - q1, sd], axis=-1)
+
+
+def get_formula_coefficients(formulas: list[Formula]) -> np.ndarray:
+    """
+    Express outlier detection formulas as coefficients of the statistics, so that the thresholds are a linear
+    combination of the stats matrix.
+    :param formulas: Outlier detection formulas.
+    :return: Array of shape (len(STATS), number of formulas, 2), last axis being (thresh_down, thresh_up).
+    """
+    coefficients = np.zeros((len(STATS), len(formulas), 2))
+    for i, formula in enumerate(formulas):
+        center = formula.adjusted_mad_weight + formula.mad_weight
+        spreads = [formula.adjusted_mad_weight * formula.adjusted_mad_constant, formula.mad_weight * formula.mad_constant,
+                   formula.iqr_weight * formula.iqr_constant, formula.sd_weight * formula.sd_constant]
+        coefficients[:, i, 0] = [center, formula.iqr_weight, 0, formula.sd_weight, *[-spread for spread in spreads]]
+        coefficients[:, i, 1] = [center, 0, formula.iqr_weight, formula.sd_weight, *spreads]
+    return coefficients
+
+
+def get_thresholds_from_stats_matrix(stats: np.ndarray, formulas: list[Formula]) -> np.ndarray:
+    """
+    Calculate the thresholds of every formula for every row of a stats matrix with a single matrix product.
+    :param stats: Array of shape (number of distributions, len(STATS)), see get_stats_matrix.
+    :param formulas: Outlier detection formulas.
+    :return: Array of shape (number of distributions, number of formulas, 2), last axis being (thresh_down, thresh_up).
+    """
+    coefficients = get_formula_coefficients(formulas)
+    # Statistics that no formula uses are zeroed, so that a NaN one, like the SD of a single value, does not spread
+    stats = np.where(coefficients.any(axis=(1, 2)), stats, 0)
+    thresholds = stats @ coefficients.reshape(len(STATS), -1)
+    return thresholds.reshape(stats.shape[0], len(formulas), 2)
+
+
+def get_thresholds_batch(df: pd.DataFrame, formulas: list[Formula]) -> np.ndarray:
+    """
+    Calculate the outlier detection thresholds of every numeric column of a dataframe for every formula at once.
+    :param df: Input dataframe. Non-numeric columns are ignored.
+    :param formulas: Outlier detection formulas.
+    :return: Array of shape (number of numeric columns, number of formulas, 2), last axis being (thresh_down,
+    thresh_up). Columns are in the order of df.select_dtypes('number').columns.
+    """
+    # One contiguous row per column, so that the reductions run over contiguous memory
+    values = np.ascontiguousarray(df.select_dtypes('number').to_numpy(dtype=float).T)
+    return get_thresholds_from_stats_matrix(get_stats_matrix(values, axis=1), formulas)
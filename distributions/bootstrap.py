@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+import numpy as np
+from distributions.batch import get_stats_matrix, get_thresholds_from_stats_matrix
+from distributions.models import Formula
+
+# Number of resampled values held at once by a call, whatever its number of workers, which bounds memory usage
+BOOTSTRAP_CHUNK_VALUES = 1 << 22
+# Largest number of threads of a call. Calls run in jobs, which already share the CPUs between sessions
+MAX_BOOTSTRAP_WORKERS = 2
+# Largest number of values bootstrapped in the app, 1000 resamples of this size taking about 10s on one core
+MAX_BOOTSTRAP_SIZE = 100_000
+
+
+def _get_resampled_thresholds(values: np.ndarray, formula: Formula, n_resamples: int,
+                              seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Calculate the thresholds of a chunk of bootstrap resamples, drawn as a single index matrix.
+    :param values: Input data, without NaNs.
+    :param formula: Outlier detection formula.
+    :param n_resamples: Number of resamples of the chunk.
+    :param seed: Seed of the chunk.
+    :return: Array of shape (n_resamples, 2), last axis being (thresh_down, thresh_up).
+    """
+    indices = np.random.default_rng(seed).integers(0, values.size, (n_resamples, values.size))
+    stats = get_stats_matrix(values[indices], axis=1)
+    return get_thresholds_from_stats_matrix(stats, [formula])[:, 0, :]
+
+
+def get_bootstrap_threshold(data: np.ndarray, formula: Formula, n_resamples: int = 1000, confidence: float = 0.95,
+                            seed: int = None, workers: int = 1,
+                            progress: Callable = None) -> tuple[tuple[float, float], tuple[float, float]]:
+    """
+    Calculate bootstrap percentile confidence intervals of the outlier detection thresholds.
+    Resamples are drawn by chunks of rows of an index matrix, and the statistics of a whole chunk are calculated with
+    axis-wise NumPy calls. Chunks can be spread across threads, NumPy releasing the GIL while it selects and sorts.
+    :param data: The input data for which outlier thresholds are calculated. NaNs are ignored.
+    :param formula: Outlier detection formula.
+    :param n_resamples: Number of bootstrap resamples.
+    :param confidence: Confidence level of the intervals.
+    :param seed: Seed of the resampling. Results do not depend on the number of workers.
+    :param workers: Number of threads, at most MAX_BOOTSTRAP_WORKERS.
+    :param progress: Called with the fraction of resamples done after each chunk. An exception it raises, like
+    JobCancelled, stops the resampling.
+    :return: (lower, upper) bounds of the confidence interval of thresh_down, then of thresh_up.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1. Given {confidence = }")
+    progress = progress or (lambda *_: None)
+    values = np.asarray(data, dtype=float).ravel()
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return (np.nan, np.nan), (np.nan, np.nan)
+
+    # Chunks are sized for the largest number of workers, so that the chunks in flight stay within
+    # BOOTSTRAP_CHUNK_VALUES and the chunks, hence the results, do not depend on the number of workers
+    workers = min(workers, MAX_BOOTSTRAP_WORKERS)
+    chunk_size = max(BOOTSTRAP_CHUNK_VALUES // (values.size * MAX_BOOTSTRAP_WORKERS), 1)
+    chunk_sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    arguments = ([values] * len(chunk_sizes), [formula] * len(chunk_sizes), chunk_sizes, seeds)
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    thresholds = []
+    try:
+        for chunk in (executor.map if executor else map)(_get_resampled_thresholds, *arguments):
+            thresholds.append(chunk)
+            progress(sum(map(len, thresholds)) / n_resamples)
+    finally:
+        # Chunks not started yet are dropped when the resampling is stopped
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    thresholds = np.concatenate(thresholds)
+
+    alpha = (1 - confidence) / 2
+    lower, upper = np.percentile(thresholds, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    return (lower[0], upper[0]), (lower[1], upper[1])
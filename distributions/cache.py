@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from distributions.models import Formula
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def get_data_fingerprint(data: np.ndarray) -> str:
+    """
+    Calculate a fast content hash of an array, with xxhash if it is installed and BLAKE2 otherwise.
+    :param data: Input array.
+    :return: Hexadecimal fingerprint of the array values, dtype and shape.
+    """
+    values = np.ascontiguousarray(data)
+    digest = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    digest.update(f'{values.dtype.str}{values.shape}'.encode())
+    digest.update(values.view(np.uint8) if values.ndim else values.tobytes())
+    return digest.hexdigest()
+
+
+class ThresholdCache:
+    """
+    Bounded LRU cache of outlier detection thresholds, keyed by data fingerprint and formula, with optional expiry.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(data: np.ndarray, formula: Formula) -> tuple:
+        """
+        Build the cache key of a threshold computation.
+        :param data: The input data for which outlier thresholds are calculated.
+        :param formula: Outlier detection formula.
+        :return: Cache key.
+        """
+        return get_data_fingerprint(data), tuple(formula.model_dump().items())
+
+    def get(self, key: tuple) -> tuple[float, float] | None:
+        """
+        Get cached thresholds, counting hits and misses.
+        :param key: Cache key, see make_key.
+        :return: Cached thresholds, or None if they are not cached or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: tuple, threshold: tuple[float, float]):
+        """
+        Cache thresholds, evicting the least recently used entries above maxsize.
+        :param key: Cache key, see make_key.
+        :param threshold: Thresholds to cache.
+        :return: None
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), threshold)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+threshold_cache = ThresholdCache()
@@ -0,0 +1,181 @@
+import argparse
+import os
+import sys
+import pandas as pd
+from distributions.core import PRESET_METHODS, get_formula_threshold, get_preset_formula
+from distributions.ingestion import PARQUET_EXTENSIONS, SNIFF_BYTES, sniff_csv_dialect
+from distributions.models import Formula
+from distributions.streaming import get_streaming_threshold
+
+CUSTOM_PARAMETERS = [f'{method.lower().replace(" ", "_")}_{parameter}' for method in Formula.METHODS
+                     for parameter in ('weight', 'constant')]
+
+
+def get_csv_dialect(path: str, sep: str = None) -> tuple[str, str]:
+    """
+    Get the values separator and decimal point of a CSV, detected from its first bytes like in the app.
+    :param path: Path of the CSV.
+    :param sep: Values separator given on the command line, detected if None.
+    :return: separator (str): Values separator.
+    decimal (str): Decimal point, see sniff_csv_dialect.
+    """
+    with open(path, 'rb') as csv_file:
+        separator, decimal = sniff_csv_dialect(csv_file.read(SNIFF_BYTES))
+    if sep is None:
+        return separator, decimal
+    return sep, decimal if sep == separator else '.'
+
+
+def read_table(path: str, columns: list[str] = None, sep: str = ',', decimal: str = '.') -> pd.DataFrame:
+    """
+    Read the chosen columns of a CSV or Parquet file.
+    :param path: Path of the file. Files ending with .parquet or .pq are read as Parquet, others as CSV.
+    :param columns: Columns to read. Defaults to all the columns.
+    :param sep: Values separator of a CSV.
+    :param decimal: Decimal point of a CSV.
+    :return: Dataframe of the chosen columns.
+    """
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, sep=sep, decimal=decimal, usecols=columns, engine='c')
+
+
+def write_table(df: pd.DataFrame, path: str = None):
+    """
+    Write a dataframe as CSV, or as Parquet if the path ends with .parquet or .pq.
+    :param df: Dataframe to write.
+    :param path: Path of the file. Defaults to the standard output, as CSV.
+    :return: None
+    """
+    if path is None:
+        df.to_csv(sys.stdout, index=False)
+    elif path.lower().endswith(PARQUET_EXTENSIONS):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m distributions',
+                                     description='Calculate outlier detection thresholds of the columns of a CSV or '
+                                                 'Parquet file.')
+    parser.add_argument('path', help='CSV or Parquet file (.parquet, .pq)')
+    parser.add_argument('-c', '--column', action='append', dest='columns',
+                        help='Column where the values are. Can be repeated. Defaults to every numeric column.')
+    parser.add_argument('--sep', help=r'Values separator of a CSV, for instance ";" or "\t". Detected from the first '
+                                      'lines by default, with the decimal point')
+    parser.add_argument('-m', '--method', choices=PRESET_METHODS, default=PRESET_METHODS[0],
+                        help='Outlier detection method, ignored if a custom weight or constant is given')
+    custom = parser.add_argument_group('custom formula', 'Weights and constants of a custom formula, 0 by default')
+    for parameter in CUSTOM_PARAMETERS:
+        custom.add_argument(f'--{parameter.replace("_", "-")}', type=float, dest=parameter)
+    parser.add_argument('-o', '--output', help='Write the thresholds to this CSV or Parquet file instead of the '
+                                               'standard output')
+    parser.add_argument('--flags', help='Write the outlier flags of every row to this CSV or Parquet file')
+    streaming = parser.add_argument_group('large files', 'Read a CSV chunk by chunk instead of loading it in memory. '
+                                                         'Median, quartiles and MAD are estimated with a quantile '
+                                                         'sketch.')
+    streaming.add_argument('--stream', action='store_true', help='Read the chosen columns chunk by chunk. Needs '
+                                                                 '--column, not available with --flags')
+    streaming.add_argument('--chunksize', type=int, default=1_000_000, help='Number of rows read at once, which '
+                                                                            'bounds memory usage')
+    return parser
+
+
+def get_formula(args: argparse.Namespace) -> Formula:
+    """
+    Get the outlier detection formula from the command line arguments.
+    :param args: Parsed arguments.
+    :return: Custom formula if any weight or constant is given, preset method formula otherwise.
+    """
+    custom_parameters = {parameter: getattr(args, parameter) for parameter in CUSTOM_PARAMETERS
+                         if getattr(args, parameter) is not None}
+    if custom_parameters:
+        return Formula(**custom_parameters)
+    return get_preset_formula(args.method)
+
+
+def count_outliers_by_chunks(path: str, thresholds: list[tuple[str, float, float]], sep: str = ',',
+                             chunksize: int = 1_000_000, decimal: str = '.') -> list[int]:
+    """
+    Count the values of CSV columns outside of their thresholds, reading the file chunk by chunk.
+    :param path: Path of the CSV.
+    :param thresholds: (column, thresh_down, thresh_up) of every column.
+    :param sep: Values separator.
+    :param chunksize: Number of rows read at once.
+    :param decimal: Decimal point.
+    :return: Number of outliers of every column.
+    """
+    counts = [0] * len(thresholds)
+    for chunk in pd.read_csv(path, sep=sep, decimal=decimal, usecols=[column for column, _, _ in thresholds],
+                             chunksize=chunksize, engine='c'):
+        for i, (column, thresh_down, thresh_up) in enumerate(thresholds):
+            values = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=float)
+            counts[i] += int(((values < thresh_down) | (values > thresh_up)).sum())
+    return counts
+
+
+def stream_thresholds(path: str, columns: list[str], formula: Formula, sep: str = ',', chunksize: int = 1_000_000,
+                      decimal: str = '.') -> pd.DataFrame:
+    """
+    Calculate the thresholds of CSV columns without loading the file in memory, see get_streaming_threshold.
+    :param path: Path of the CSV.
+    :param columns: Columns where the values are.
+    :param formula: Outlier detection formula.
+    :param sep: Values separator.
+    :param chunksize: Number of rows read at once.
+    :param decimal: Decimal point.
+    :return: Dataframe with columns 'column', 'thresh_down', 'thresh_up' and 'outliers'.
+    """
+    thresholds = [(column, *get_streaming_threshold(path, column, formula, sep=sep, chunksize=chunksize,
+                                                    decimal=decimal))
+                  for column in columns]
+    outliers = count_outliers_by_chunks(path, thresholds, sep=sep, chunksize=chunksize, decimal=decimal)
+    return pd.DataFrame([(*threshold, count) for threshold, count in zip(thresholds, outliers)],
+                        columns=['column', 'thresh_down', 'thresh_up', 'outliers'])
+
+
+def main(argv: list[str] = None) -> int:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        parser.error(f'{args.path} does not exist')
+    sep = '\t' if args.sep == r'\t' else args.sep
+    is_parquet = args.path.lower().endswith(PARQUET_EXTENSIONS)
+    sep, decimal = (sep, '.') if is_parquet else get_csv_dialect(args.path, sep)
+
+    if args.stream:
+        if is_parquet:
+            parser.error('--stream reads CSV files only')
+        if not args.columns:
+            parser.error('--stream needs at least one --column')
+        if args.flags is not None:
+            parser.error('--flags is not available with --stream')
+        try:
+            write_table(stream_thresholds(args.path, args.columns, get_formula(args), sep=sep,
+                                          chunksize=args.chunksize, decimal=decimal), args.output)
+        except ValueError as error:
+            parser.error(str(error))
+        return 0
+
+    try:
+        df = read_table(args.path, columns=args.columns, sep=sep, decimal=decimal)
+    except ValueError as error:
+        parser.error(str(error))
+    columns = args.columns or list(df.select_dtypes('number').columns)
+    non_numeric = [column for column in columns if not pd.api.types.is_numeric_dtype(df[column])]
+    if non_numeric:
+        parser.error(f'columns {non_numeric} are not numeric')
+
+    formula = get_formula(args)
+    thresholds, flags = [], pd.DataFrame(index=df.index)
+    for column in columns:
+        values = df[column].to_numpy(dtype=float)
+        thresh_down, thresh_up = get_formula_threshold(values, formula)
+        flags[column] = (values < thresh_down) | (values > thresh_up)
+        thresholds.append((column, thresh_down, thresh_up, int(flags[column].sum())))
+
+    write_table(pd.DataFrame(thresholds, columns=['column', 'thresh_down', 'thresh_up', 'outliers']), args.output)
+    if args.flags is not None:
+        write_table(flags, args.flags)
+    return 0
@@ -0,0 +1,348 @@
+import math
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from distributions.models import Distribution, Formula, OutlierScore, RobustStats
+from distributions.cache import threshold_cache
+
+# Scale factor of the adjusted MAD, inverse of the normal quantile function at 75th percentile
+ADJUSTED_MAD_SCALE = 1 / NormalDist().inv_cdf(3 / 4)
+PRESET_METHODS = ['2.5 MAD', '2.5 Adjusted MAD', '1.5 IQR', '2.5 SD', '3.0 SD']
+
+
+def get_mad(data: np.ndarray) -> float:
+    """
+    Calculate adjusted Median Absolute Deviation (MAD) of a given distribution.
+    :param data: Input data for which adjusted MAD is calculated.
+    :return: Adjusted MAD of the input data.
+    """
+    median_value = np.median(data)
+    absolute_deviations = np.abs(data - median_value)
+    mad_value = np.median(absolute_deviations)
+    scaled_mad = mad_value * ADJUSTED_MAD_SCALE
+
+    return scaled_mad
+
+
+def calculate_mad(data: np.ndarray) -> float:
+    """
+    Calculate the Median Absolute Deviation (MAD) of a given distribution.
+    :param data: Input data for which MAD is calculated.
+    :return: MAD of the input data.
+    """
+    median = np.nanmedian(data)
+    deviations = np.abs(data - median)
+    mad = np.nanmedian(deviations)
+    return mad * 1.4826
+
+
+def calculate_iqr(data: np.ndarray) -> float:
+    """
+    Calculate the Inter-Quartile-Range (IQR) of a given distribution.
+    :param data: Input data for which IQR is calculated.
+    :return: IQR of the input data.
+    """
+    q1 = np.nanpercentile(data, 25)
+    q3 = np.nanpercentile(data, 75)
+    iqr = q3 - q1
+    return iqr
+
+
+def calculate_sd(data: np.ndarray) -> float:
+    """
+    Calculate the Standard Deviation (sd) of a given distribution
+    :param data: Input data for which sd is calculated.
+    :return: sd: Standard deviation of the input data.
+    """
+    mean_value = np.nanmean(data)
+    squared_diff = (np.asarray(data, dtype=float) - mean_value) ** 2
+    div = len(data) - 1
+    variance = np.nansum(squared_diff) / div
+    sd = math.sqrt(variance)
+    return sd
+
+
+def get_outlier_amount(initial_distribution_size: int, rate: float) -> float:
+    """
+    Calculate the amount of outliers needed in order to reach desired outliers' rate in a distribution.
+    :param initial_distribution_size: Length of the initial distribution.
+    :param rate: Desired outliers' rate in the new distribution.
+    :return: Amount of outliers needed to the reach desired rate.
+    """
+    if 1 >= rate >= 0:
+        outlier_amount = rate * initial_distribution_size / (1 - rate)
+        outlier_amount = round(outlier_amount)
+        # If rate is not zero, returns at least 1 outlier
+        if outlier_amount < 1 and rate != 0:
+            outlier_amount = 1
+        return outlier_amount
+    else:
+        raise ValueError(f"rate must be between 0 and 1. Given {rate = }")
+
+
+"""
+Distribution manipulation
+"""
+
+
+def _linear_percentile(low: float, high: float, virtual_index: float, previous_index: float) -> float:
+    """
+    Interpolate a percentile between its two surrounding order statistics, the same way numpy's 'linear' method does.
+    :param low: Order statistic at previous_index.
+    :param high: Order statistic right after previous_index.
+    :param virtual_index: Fractional rank of the percentile.
+    :param previous_index: Floor of virtual_index.
+    :return: Interpolated percentile.
+    """
+    gamma = virtual_index - previous_index
+    diff = high - low
+    if gamma >= 0.5:
+        return high - diff * (1 - gamma)
+    return low + diff * gamma
+
+
+def get_robust_stats(data: np.ndarray) -> RobustStats:
+    """
+    Calculate every statistic needed by the outlier detection formulas in a single pass over the data.
+    NaNs are removed once, the data is partitioned once for the median and quartiles, and the deviations are
+    partitioned once for the MAD. Results are identical to calculate_mad, get_mad, calculate_iqr and calculate_sd.
+    :param data: Input data for which statistics are calculated.
+    :return: RobustStats with median, quartiles, mean, SD, MAD and adjusted MAD of the input data.
+    """
+    values = np.asarray(data, dtype=float).ravel()
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        return RobustStats()
+
+    # Ranks of the quartiles (numpy 'linear' method) and of the median
+    ranks = {}
+    for q in (0.25, 0.75):
+        virtual_index = n * q + (1 + q * -1) - 1
+        previous_index = math.floor(virtual_index)
+        ranks[q] = (virtual_index, previous_index, max(previous_index, 0), min(previous_index + 1, n - 1))
+    median_ranks = ((n - 1) // 2, n // 2)
+    kth = sorted({*median_ranks, *(rank for q in ranks for rank in ranks[q][2:])})
+    partitioned = np.partition(values, kth)
+
+    median = (partitioned[median_ranks[0]] + partitioned[median_ranks[1]]) / 2 if n % 2 == 0 \
+        else partitioned[median_ranks[1]]
+    q1, q3 = [_linear_percentile(partitioned[ranks[q][2]], partitioned[ranks[q][3]], ranks[q][0], ranks[q][1])
+              for q in (0.25, 0.75)]
+
+    mean = np.mean(values)
+    centered = values - mean
+    variance = np.sum(centered * centered) / (n - 1) if n > 1 else np.nan
+    sd = math.sqrt(variance)
+
+    # Partitioning the deviations in place, the initial data is not needed anymore
+    deviations = np.abs(np.subtract(values, median, out=centered), out=centered)
+    deviations.partition(median_ranks)
+    raw_mad = (deviations[median_ranks[0]] + deviations[median_ranks[1]]) / 2 if n % 2 == 0 \
+        else deviations[median_ranks[1]]
+
+    return RobustStats(count=n, median=median, q1=q1, q3=q3, mean=mean, sd=sd, mad=raw_mad * 1.4826,
+                       adjusted_mad=raw_mad * ADJUSTED_MAD_SCALE)
+
+
+def get_threshold_from_stats(stats: RobustStats, weight_mad: float, weight_iqr: float, weight_sd: float,
+                             weight_adjusted_mad: float, const_mad: float, const_iqr: float, const_sd: float,
+                             const_adjusted_mad: float) -> tuple[float, float]:
+    """
+    Calculate outlier detection thresholds from precomputed statistics. See get_threshold for the parameters.
+    :param stats: Statistics of the data for which outlier thresholds are calculated.
+    :return: thresh_down (float): Lower outlier detection threshold.
+    thresh_up (float): Upper outlier detection threshold.
+    """
+    thresh_up = weight_adjusted_mad * (stats.median + const_adjusted_mad * stats.adjusted_mad) + weight_mad * (
+                stats.median + const_mad * stats.mad) + weight_iqr * (
+                        stats.q3 + const_iqr * stats.iqr) + weight_sd * (stats.mean + const_sd * stats.sd)
+    thresh_down = weight_adjusted_mad * (stats.median - const_adjusted_mad * stats.adjusted_mad) + weight_mad * (
+                stats.median - const_mad * stats.mad) + weight_iqr * (
+                          stats.q1 - const_iqr * stats.iqr) + weight_sd * (stats.mean - const_sd * stats.sd)
+    return thresh_down, thresh_up
+
+
+def get_threshold(data: np.ndarray, weight_mad: float, weight_iqr: float, weight_sd: float, weight_adjusted_mad: float,
+                  const_mad: float,
+                  const_iqr: float, const_sd: float, const_adjusted_mad: float) -> tuple[float, float]:
+    """
+    Calculate outlier detection thresholds using a combination of MAD, IQR, and SD.
+    :param data: The input data for which outlier thresholds are calculated.
+    :param weight_mad: Weight for MAD component in the threshold calculation.
+    :param weight_iqr: Weight for IQR component in the threshold calculation.
+    :param weight_sd: Weight for SD component in the threshold calculation.
+    :param weight_adjusted_mad: Weight for adjusted MAD component in the threshold calculation.
+    :param const_mad: Constant multiplier for MAD component in the threshold calculation.
+    :param const_iqr: Constant multiplier for IQR component in the threshold calculation.
+    :param const_sd: Constant multiplier for SD component in the threshold calculation.
+    :param const_adjusted_mad: Constant multiplier for adjusted MAD component in the threshold calculation.
+    :return: thresh_down (float): Lower outlier detection threshold.
+    thresh_up (float): Upper outlier detection threshold.
+    """
+    return get_threshold_from_stats(get_robust_stats(data), weight_mad=weight_mad, weight_iqr=weight_iqr,
+                                    weight_sd=weight_sd, weight_adjusted_mad=weight_adjusted_mad,
+                                    const_mad=const_mad, const_iqr=const_iqr, const_sd=const_sd,
+                                    const_adjusted_mad=const_adjusted_mad)
+
+
+def get_formula_threshold_from_stats(stats: RobustStats, formula: Formula) -> tuple[float, float]:
+    """
+    Calculate outlier detection thresholds of an outlier detection formula from precomputed statistics.
+    :param stats: Statistics of the data for which outlier thresholds are calculated.
+    :param formula: Outlier detection formula.
+    :return: thresh_down (float): Lower outlier detection threshold.
+    thresh_up (float): Upper outlier detection threshold.
+    """
+    return get_threshold_from_stats(stats, weight_mad=formula.mad_weight, weight_iqr=formula.iqr_weight,
+                                    weight_sd=formula.sd_weight, weight_adjusted_mad=formula.adjusted_mad_weight,
+                                    const_mad=formula.mad_constant, const_iqr=formula.iqr_constant,
+                                    const_sd=formula.sd_constant, const_adjusted_mad=formula.adjusted_mad_constant)
+
+
+def get_formula_threshold(data: np.ndarray, formula: Formula) -> tuple[float, float]:
+    """
+    Calculate outlier detection thresholds of an outlier detection formula.
+    :param data: The input data for which outlier thresholds are calculated.
+    :param formula: Outlier detection formula.
+    :return: thresh_down (float): Lower outlier detection threshold.
+    thresh_up (float): Upper outlier detection threshold.
+    """
+    return get_formula_threshold_from_stats(get_robust_stats(data), formula)
+
+
+def get_cached_formula_threshold(data: np.ndarray, formula: Formula) -> tuple[float, float]:
+    """
+    Calculate outlier detection thresholds of an outlier detection formula, reusing the thresholds already calculated
+    for the same data and formula.
+    :param data: The input data for which outlier thresholds are calculated.
+    :param formula: Outlier detection formula.
+    :return: thresh_down (float): Lower outlier detection threshold.
+    thresh_up (float): Upper outlier detection threshold.
+    """
+    key = threshold_cache.make_key(data, formula)
+    threshold = threshold_cache.get(key)
+    if threshold is None:
+        threshold = get_formula_threshold(data, formula)
+        threshold_cache.set(key, threshold)
+    return threshold
+
+
+def score_outliers(data: np.ndarray, thresh_down: float, thresh_up: float) -> OutlierScore:
+    """
+    Flag the data points outside of the thresholds.
+    The mask is stored as a packed bitset and the flagged indices as the smallest integer type that fits.
+    :param data: Input data. NaNs are never flagged.
+    :param thresh_down: Lower outlier detection threshold.
+    :param thresh_up: Upper outlier detection threshold.
+    :return: OutlierScore with the mask, the flagged indices and the number of outliers on each side.
+    """
+    values = np.asarray(data, dtype=float).ravel()
+    below = values < thresh_down
+    above = values > thresh_up
+    count_down, count_up = int(np.count_nonzero(below)), int(np.count_nonzero(above))
+    flagged = np.logical_or(below, above, out=below)
+    index_type = np.int32 if values.size <= np.iinfo(np.int32).max else np.int64
+    return OutlierScore(size=values.size, count_down=count_down, count_up=count_up,
+                        packed_mask=np.packbits(flagged), indices=np.flatnonzero(flagged).astype(index_type))
+
+
+def get_confusion_matrix(score: OutlierScore, types: np.ndarray) -> pd.DataFrame:
+    """
+    Compare flagged data points with their known type.
+    :param score: Flagged data points, see score_outliers.
+    :param types: Type of each data point, 'Outliers' for the actual outliers.
+    :return: Dataframe with actual type as index and 'Flagged' and 'Not flagged' counts as columns.
+    """
+    actual = np.asarray(types) == 'Outliers'
+    true_positives = int(np.count_nonzero(actual[score.indices]))
+    false_positives = score.count - true_positives
+    actual_outliers = int(np.count_nonzero(actual))
+    return pd.DataFrame({'Flagged': [true_positives, false_positives],
+                         'Not flagged': [actual_outliers - true_positives,
+                                         score.size - actual_outliers - false_positives]},
+                        index=pd.Index(['Outliers', 'Valid data points'], name='Actual'))
+
+
+def get_preset_formula(outlier_method: str) -> Formula:
+    """
+    Get the formula of one of the most used outlier detection methods.
+    :param outlier_method: Method, one of PRESET_METHODS.
+    :return: Outlier detection formula.
+    """
+    if outlier_method not in PRESET_METHODS:
+        raise ValueError(f"outlier_method must be one of {PRESET_METHODS}. Given {outlier_method = }")
+    formula = Formula()
+    if outlier_method.endswith('SD'):
+        formula.sd_weight = 1
+        formula.sd_constant = float(outlier_method[:3])
+    elif outlier_method == '2.5 MAD':
+        formula.mad_weight = 1
+        formula.mad_constant = float(outlier_method[:3])
+    elif outlier_method.endswith('Adjusted MAD'):
+        formula.adjusted_mad_weight = 1
+        formula.adjusted_mad_constant = float(outlier_method[:3])
+    else:
+        formula.iqr_weight = 1
+        formula.iqr_constant = 1.5
+    return formula
+
+
+def get_data_points(distribution: np.ndarray, distribution_size: int, outliers: np.ndarray,
+                    outliers_rate: float, seed: int = None) -> np.ndarray:
+    """
+    Define distribution array of desired size with desired outliers' rate.
+    :param distribution: Input array or pandas Series containing the distribution.
+    :param distribution_size: Desired number of data points from the initial distribution.
+    :param outliers: Input array or pandas Series containing the outliers.
+    :param outliers_rate: Desired rate of outliers in the final distribution.
+    :param seed: Seed of the outliers sampling, for reproducible distributions.
+    :return: Numpy array of the final distribution with outliers.
+    """
+    rng = np.random.default_rng(seed)
+    distribution = np.asarray(distribution, dtype=float)
+    outliers = np.asarray(outliers, dtype=float)
+    outlier_amount = get_outlier_amount(distribution_size, outliers_rate)
+
+    data_points = np.empty(distribution_size + outlier_amount)
+    data_points[:distribution_size] = distribution[:distribution_size]
+    data_points[distribution_size:] = outliers[rng.choice(outliers.size, outlier_amount, replace=False, shuffle=False)]
+    return data_points
+
+
+def get_labelled_distribution(values: np.ndarray, n_distribution: int) -> pd.DataFrame:
+    """
+    Wrap sampled values in a distribution Dataframe, the values after n_distribution being the outliers.
+    :param values: Values of the distribution followed by the values of the outliers.
+    :param n_distribution: Number of values of the distribution.
+    :return: Dataframe with column 'Distribution' with the values and categorical column 'Type'.
+    """
+    type_codes = np.zeros(values.size, dtype=np.int8)
+    type_codes[n_distribution:] = Distribution.DATA_TYPES.index('Outliers')
+    return pd.DataFrame({'Distribution': values,
+                         'Type': pd.Categorical.from_codes(type_codes, categories=Distribution.DATA_TYPES)})
+
+
+def get_full_distribution(distribution: np.ndarray, n_distribution: int, outliers: np.ndarray,
+                          outliers_rate: float, seed: int = None) -> pd.DataFrame:
+    """
+    Get Dataframe of distribution with outliers from desired length, outliers kind, and outliers rate.
+    Values are drawn without replacement with a numpy Generator, straight into a single preallocated array.
+    :param distribution: Array or Series with distribution values
+    :param n_distribution: Length of the distribution
+    :param outliers: Array or Series with outliers values
+    :param outliers_rate: Rate of outliers to be added to the initial distribution
+    :param seed: Seed of the sampling, for reproducible distributions
+    :return: Dataframe with column 'Distribution' including values of distribution and outliers, and column 'Type' indicating if
+    each datapoint is a valid data point or an outlier.
+    """
+    rng = np.random.default_rng(seed)
+    distribution = np.asarray(distribution, dtype=float)
+    outliers = np.asarray(outliers, dtype=float)
+    outlier_amount = get_outlier_amount(n_distribution, outliers_rate)
+
+    values = np.empty(n_distribution + outlier_amount)
+    values[:n_distribution] = distribution[rng.choice(distribution.size, n_distribution, replace=False,
+                                                      shuffle=False)]
+    values[n_distribution:] = outliers[rng.choice(outliers.size, outlier_amount, replace=False, shuffle=False)]
+    return get_labelled_distribution(values, n_distribution)
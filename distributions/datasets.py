@@ -0,0 +1,137 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+# Reference dataset name: decimal separator of its CSV
+REFERENCE_DATASETS = {'distributions': '.', 'outliers': ','}
+
+
+def _get_file_hash(path: str) -> str:
+    """
+    Calculate the SHA-256 hash of a file.
+    :param path: Path of the file.
+    :return: Hexadecimal hash of the file.
+    """
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def _write_atomically(path: str, write: Callable, mode: str = 'wb'):
+    """
+    Write a file through a temporary file in the same directory, then move it into place. A reader, or a memory map
+    of the previous file, never sees a truncated or partly written file.
+    :param path: Path of the file.
+    :param write: Function writing the content to an open file.
+    :param mode: Mode of the temporary file.
+    :return: None
+    """
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with open(descriptor, mode) as temporary_file:
+            write(temporary_file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def _read_sidecar(csv_path: str, npy_path: str, meta_path: str) -> dict[str, np.ndarray] | None:
+    """
+    Memory-map the precompiled sidecar of a reference dataset if it is still valid.
+    The sidecar is valid if the CSV has the same modification time and size, or the same hash, as when it was built.
+    :param csv_path: Path of the source CSV.
+    :param npy_path: Path of the sidecar values.
+    :param meta_path: Path of the sidecar metadata.
+    :return: Values by column name, or None if there is no valid sidecar.
+    """
+    try:
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+        csv_stat = os.stat(csv_path)
+        if (meta['mtime_ns'], meta['size']) != (csv_stat.st_mtime_ns, csv_stat.st_size):
+            if meta['size'] != csv_stat.st_size or meta['sha256'] != _get_file_hash(csv_path):
+                return None
+            meta['mtime_ns'] = csv_stat.st_mtime_ns
+            _write_atomically(meta_path, lambda meta_file: json.dump(meta, meta_file), mode='w')
+        values = np.load(npy_path, mmap_mode='r')
+    except (OSError, ValueError, KeyError):
+        return None
+    return dict(zip(meta['columns'], values))
+
+
+def _write_sidecar(csv_path: str, npy_path: str, meta_path: str, df: pd.DataFrame):
+    """
+    Save a reference dataset as a precompiled sidecar, one contiguous row of values per column.
+    :param csv_path: Path of the source CSV.
+    :param npy_path: Path of the sidecar values.
+    :param meta_path: Path of the sidecar metadata.
+    :param df: Parsed reference dataset.
+    :return: None
+    """
+    csv_stat = os.stat(csv_path)
+    meta = {'columns': list(df.columns), 'mtime_ns': csv_stat.st_mtime_ns, 'size': csv_stat.st_size,
+            'sha256': _get_file_hash(csv_path)}
+    os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+    # Other threads or processes may have the previous sidecar memory-mapped, which must not be truncated
+    _write_atomically(npy_path, lambda npy_file: np.save(npy_file, np.ascontiguousarray(df.to_numpy(dtype=float).T)))
+    _write_atomically(meta_path, lambda meta_file: json.dump(meta, meta_file), mode='w')
+
+
+@functools.lru_cache(maxsize=None)
+def load_reference_dataset(name: str, persist: bool = True) -> dict[str, np.ndarray]:
+    """
+    Load a bundled reference dataset once per process.
+    When persist is True, the parsed CSV is saved as a .npy sidecar in data/.cache, which is memory-mapped by the
+    next processes until the CSV changes.
+    :param name: Name of the reference dataset, one of REFERENCE_DATASETS.
+    :param persist: Whether to read and write the precompiled sidecar.
+    :return: Contiguous read-only float arrays by shape name.
+    """
+    if name not in REFERENCE_DATASETS:
+        raise ValueError(f"name must be one of {list(REFERENCE_DATASETS)}. Given {name = }")
+    csv_path = os.path.join(DATA_DIR, f'{name}.csv')
+    npy_path, meta_path = os.path.join(CACHE_DIR, f'{name}.npy'), os.path.join(CACHE_DIR, f'{name}.json')
+
+    if persist:
+        values = _read_sidecar(csv_path, npy_path, meta_path)
+        if values is not None:
+            return values
+
+    df = pd.read_csv(csv_path, sep=';', decimal=REFERENCE_DATASETS[name])
+    if persist:
+        try:
+            _write_sidecar(csv_path, npy_path, meta_path, df)
+            return _read_sidecar(csv_path, npy_path, meta_path)
+        except OSError:
+            pass
+    values = np.ascontiguousarray(df.to_numpy(dtype=float).T)
+    values.flags.writeable = False
+    return dict(zip(df.columns, values))
+
+
+def get_distribution_values(distribution_shape: str) -> np.ndarray:
+    """
+    Get the reference values of a distribution shape.
+    :param distribution_shape: Shape of the distribution, one of Distribution.DISTRIBUTION_SHAPES.
+    :return: Read-only array of the distribution values.
+    """
+    return load_reference_dataset('distributions')[distribution_shape]
+
+
+def get_outliers_values(outliers_shape: str) -> np.ndarray:
+    """
+    Get the reference values of an outliers shape.
+    :param outliers_shape: Shape of the outliers, one of Distribution.OUTLIERS_SHAPES.
+    :return: Read-only array of the outliers values.
+    """
+    return load_reference_dataset('outliers')[outliers_shape]
@@ -1,156 +1,36 @@
+import os
+import uuid
+from typing import Callable
 import numpy as np
 import pandas as pd
-import math
-from distributions.models import Formula
+import pyarrow as pa
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import norm
-
-
-def get_mad(data: np.ndarray) -> float:
-    """
-    Calculate adjusted Median Absolute Deviation (MAD) of a given distribution.
-    :param data: Input data for which adjusted MAD is calculated.
-    :return: Adjusted MAD of the input data.
-    """
-    median_value = np.median(data)
-    absolute_deviations = np.abs(data - median_value)
-    mad_value = np.median(absolute_deviations)
-    scale_factor = 1 / norm.ppf(3/4)  # Quantile function at 75th percentile
-    scaled_mad = mad_value * scale_factor
-
-    return scaled_mad
-
-
-def calculate_mad(data: np.ndarray) -> float:
-    """
-    Calculate the Median Absolute Deviation (MAD) of a given distribution.
-    :param data: Input data for which MAD is calculated.
-    :return: MAD of the input data.
-    """
-    median = np.nanmedian(data)
-    deviations = np.abs(data - median)
-    mad = np.nanmedian(deviations)
-    return mad * 1.4826
-
-
-def calculate_iqr(data: np.ndarray) -> float:
-    """
-    Calculate the Inter-Quartile-Range (IQR) of a given distribution.
-    :param data: Input data for which IQR is calculated.
-    :return: IQR of the input data.
-    """
-    q1 = np.nanpercentile(data, 25)
-    q3 = np.nanpercentile(data, 75)
-    iqr = q3 - q1
-    return iqr
-
-
-def calculate_sd(data: np.ndarray) -> float:
-    """
-    Calculate the Standard Deviation (sd) of a given distribution
-    :param data: Input data for which sd is calculated.
-    :return: sd: Standard deviation of the input data.
-    """
-    mean_value = np.nanmean(data)
-    squared_diff = [(x - mean_value) ** 2 for x in data]
-    div = len(data) - 1
-    variance = np.nansum(squared_diff) / div
-    sd = math.sqrt(variance)
-    return sd
-
-
-def get_outlier_amount(initial_distribution_size: int, rate: float) -> float:
-    """
-    Calculate the amount of outliers needed in order to reach desired outliers' rate in a distribution.
-    :param initial_distribution_size: Length of the initial distribution.
-    :param rate: Desired outliers' rate in the new distribution.
-    :return: Amount of outliers needed to the reach desired rate.
-    """
-    if 1 >= rate >= 0:
-        outlier_amount = rate * initial_distribution_size / (1 - rate)
-        outlier_amount = round(outlier_amount)
-        # If rate is not zero, returns at least 1 outlier
-        if outlier_amount < 1 and rate != 0:
-            outlier_amount = 1
-        return outlier_amount
-    else:
-        raise ValueError(f"rate must be between 0 and 1. Given {rate = }")
-
-
-"""
-Distribution manipulation
-"""
-
-
-def get_threshold(data: np.ndarray, weight_mad: float, weight_iqr: float, weight_sd: float, weight_adjusted_mad: float,
-                  const_mad: float,
-                  const_iqr: float, const_sd: float, const_adjusted_mad: float) -> float:
-    """
-    Calculate outlier detection thresholds using a combination of MAD, IQR, and SD.
-    :param data: The input data for which outlier thresholds are calculated.
-    :param weight_mad: Weight for MAD component in the threshold calculation.
-    :param weight_iqr: Weight for IQR component in the threshold calculation.
-    :param weight_sd: Weight for SD component in the threshold calculation.
-    :param weight_adjusted_mad: Weight for adjusted MAD component in the threshold calculation.
-    :param const_mad: Constant multiplier for MAD component in the threshold calculation.
-    :param const_iqr: Constant multiplier for IQR component in the threshold calculation.
-    :param const_sd: Constant multiplier for SD component in the threshold calculation.
-    :param const_adjusted_mad: Constant multiplier for adjusted MAD component in the threshold calculation.
-    :return: thresh_down (float): Lower outlier detection threshold.
-    thresh_up (float): Upper outlier detection threshold.
-    """
-    mad = calculate_mad(data)
-    iqr = calculate_iqr(data)
-    sd = calculate_sd(data)
-    adjusted_mad = get_mad(data)
-    thresh_up = weight_adjusted_mad * (np.nanmedian(data) + const_adjusted_mad * adjusted_mad) + weight_mad * (
-                np.nanmedian(data) + const_mad * mad) + weight_iqr * (
-                        np.nanpercentile(data, 75) + const_iqr * iqr) + weight_sd * (np.nanmean(data) + const_sd * sd)
-    thresh_down = weight_adjusted_mad * (np.nanmedian(data) - const_adjusted_mad * adjusted_mad) + weight_mad * (
-                np.nanmedian(data) - const_mad * mad) + weight_iqr * (
-                          np.nanpercentile(data, 25) - const_iqr * iqr) + weight_sd * (np.nanmean(data) - const_sd * sd)
-    return thresh_down, thresh_up
-
-
-def get_data_points(distribution: np.ndarray, distribution_size: int, outliers: np.ndarray,
-                    outliers_rate: float) -> np.ndarray:
-    """
-    Define distribution array of desired size with desired outliers' rate.
-    :param distribution: Input pandas Series containing the distribution.
-    :param distribution_size: Desired number of data points from the initial distribution.
-    :param outliers: Input pandas Series containing the outliers.
-    :param outliers_rate: Desired rate of outliers in the final distribution.
-    :return: Numpy array of the final distribution with outliers.
-    """
-    distribution = distribution.__array__()
-    new_distribution = [distribution[x] for x in range(distribution_size)]
-    outlier_amount = get_outlier_amount(distribution_size, outliers_rate)
-    new_outliers = outliers.sample(frac=outlier_amount / len(outliers)).__array__()
-    return np.concatenate([new_distribution, new_outliers])
-
-
-def get_full_distribution(distribution: pd.Series, n_distribution: int, outliers: str,
-                          outliers_rate: float) -> pd.DataFrame:
-    """
-    Get Dataframe of distribution with outliers from desired length, outliers kind, and outliers rate.
-    :param distribution: Series with distribution values
-    :param n_distribution: Length of the distribution
-    :param outliers: Type of outliers to be added to the initial distribution
-    :param outliers_rate: Rate of outliers to be added to the initial distribution
-    :return: Dataframe with column 'Distribution' including values of distribution and outliers, and column 'Type' indicating if
-    each datapoint is a valid data point or an outlier.
-    """
-    distribution_df = pd.DataFrame()
-    distribution_df["Distribution"] = distribution.sample(frac=n_distribution / len(distribution))
-    distribution_df["Type"] = "Valid data points"
-
-    outliers_df = pd.DataFrame()
-    outlier_amount = get_outlier_amount(n_distribution, outliers_rate)
-    outliers_df["Distribution"] = outliers.sample(frac=outlier_amount / len(outliers))
-    outliers_df["Type"] = "Outliers"
-    return pd.concat([distribution_df, outliers_df])
+from distributions.models import Analysis, Formula, OutlierScore
+from distributions.kde import get_binned_kde
+from distributions.rolling import get_rolling_threshold
+from distributions.grouped import get_grouped_thresholds
+from distributions.profiling import Profiler, stage
+from distributions.ingestion import read_table_bytes
+from distributions.sorted_column import SortedColumn
+from distributions.cache import get_data_fingerprint
+from distributions.bootstrap import MAX_BOOTSTRAP_SIZE
+from distributions.jobs import Job, JobCancelled, get_analysis, job_manager
+# The statistics live in distributions.core, which does not import streamlit nor the plotting libraries
+from distributions.core import ADJUSTED_MAD_SCALE, PRESET_METHODS, calculate_iqr, calculate_mad, calculate_sd, \
+    get_cached_formula_threshold, get_confusion_matrix, get_data_points, get_formula_threshold, get_formula_threshold_from_stats, \
+    get_full_distribution, get_labelled_distribution, get_mad, get_outlier_amount, get_preset_formula, \
+    get_robust_stats, get_threshold, get_threshold_from_stats, score_outliers
+
+# Above this number of rows, time series are thinned out before being plotted
+MAX_PLOTTED_ROWS = 5000
+# Number of groups with the most outliers plotted as small multiples
+TOP_OFFENDERS = 6
+# Number of seconds between two refreshes of the progress of a job
+PROGRESS_INTERVAL = 0.5
+# Environment variable with the path of the JSON lines file where timings are exported
+PROFILE_PATH_VARIABLE = 'OUTLIERS_PROFILE_PATH'
+# Session state key of the inputs fingerprint and result of the last finished job of the session
+JOB_RESULT_KEY = 'job_result'
 
 
 def formula_choice() -> Formula:
@@ -165,19 +45,8 @@ def formula_choice() -> Formula:
         user_formula = Formula()
 
         if not custom:
-            outlier_method = st.radio("Method", ['2.5 MAD', '2.5 Adjusted MAD', '1.5 IQR', '2.5 SD', '3.0 SD'])
-            if outlier_method.endswith('SD'):
-                user_formula.sd_weight = 1
-                user_formula.sd_constant = float(outlier_method[:3])
-            elif outlier_method == '2.5 MAD':
-                user_formula.mad_weight = 1
-                user_formula.mad_constant = float(outlier_method[:3])
-            elif outlier_method.endswith('Adjusted MAD'):
-                user_formula.adjusted_mad_weight = 1
-                user_formula.adjusted_mad_constant = float(outlier_method[:3])
-            else:
-                user_formula.iqr_weight = 1
-                user_formula.iqr_constant = 1.5
+            outlier_method = st.radio("Method", PRESET_METHODS)
+            user_formula = get_preset_formula(outlier_method)
 
         else:
             user_formula.mad_weight, user_formula.iqr_weight, user_formula.sd_weight, user_formula.adjusted_mad_weight = [
@@ -221,24 +90,38 @@ def formula_choice() -> Formula:
     return user_formula
 
 
-def distribution_graph(distribution: pd.DataFrame, formula: Formula, kind='KDE'):
+def distribution_graph(distribution: pd.DataFrame, formula: Formula, kind='KDE', confidence_interval: bool = False,
+                       analysis: Analysis = None):
     """
     Display a KDE plot or a histogram on a streamlit app showing threshold calculated from an outlier detection formula.
     :param distribution: Dataframe with column 'Distribution' with values and column 'Type' with data type.
     :param formula: Outlier detection formula
-    :param kind: Kind of dataframe to show (KDE or histogram)
+    :param kind: Kind of dataframe to show (KDE, fast KDE or histogram)
+    :param confidence_interval: Whether to shade the bootstrap confidence interval of each threshold
+    :param analysis: Thresholds and flagged points already calculated, for instance by a job. Calculated if not given.
     :return: None
     """
+    if kind.startswith('Fast'):
+        fast_distribution_graph(distribution=distribution, formula=formula, confidence_interval=confidence_interval,
+                                analysis=analysis)
+        return
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # Set the background color and create a kernel density estimate plot without bars
     sns.set_theme()
     fig = plt.figure()
 
     # Create a KDE plot with different colors based on the "Type" column
     try:
-        if kind.startswith('KDE'):
-            ax = sns.kdeplot(data=distribution, x='Distribution', hue='Type', fill=True, common_norm=True, legend=True)
-        else:
-            ax = sns.histplot(data=distribution, x='Distribution', hue='Type', fill=True, common_norm=True, legend=True)
+        with stage('plot'):
+            if kind.startswith('KDE'):
+                ax = sns.kdeplot(data=distribution, x='Distribution', hue='Type', fill=True, common_norm=True,
+                                 legend=True)
+            else:
+                ax = sns.histplot(data=distribution, x='Distribution', hue='Type', fill=True, common_norm=True,
+                                  legend=True)
 
         # Set labels
         plt.xlabel('Value')
@@ -247,14 +130,14 @@ def distribution_graph(distribution: pd.DataFrame, formula: Formula, kind='KDE')
         distribution_ndarray = distribution['Distribution'].__array__()
 
         # Calculate threshold and indicate it on the graph with vertical lines
-        threshold = get_threshold(data=distribution_ndarray, weight_mad=formula.mad_weight,
-                                  weight_iqr=formula.iqr_weight, weight_sd=formula.sd_weight,
-                                  weight_adjusted_mad=formula.adjusted_mad_weight,
-                                  const_mad=formula.mad_constant,
-                                  const_iqr=formula.iqr_constant, const_sd=formula.sd_constant,
-                                  const_adjusted_mad=formula.adjusted_mad_constant)
+        if analysis is None:
+            analysis = get_analysis(distribution_ndarray, formula, confidence_interval)
+        threshold = analysis.threshold
         ax.axvline(x=threshold[0], color='blue', linestyle='--')
         ax.axvline(x=threshold[1], color='blue', linestyle='--')
+        if analysis.intervals is not None:
+            for interval in analysis.intervals:
+                ax.axvspan(*interval, color='blue', alpha=0.15, linewidth=0)
 
         # Legend
         sns.move_legend(ax, loc='upper right')
@@ -262,16 +145,355 @@ def distribution_graph(distribution: pd.DataFrame, formula: Formula, kind='KDE')
         plt.setp(ax.get_legend().get_title(), fontsize='10')  # for legend title
 
         # Show graph
-        with st.container(border=True):
+        with st.container(border=True), stage('render'):
             st.pyplot(fig)
+            confidence_interval_note(confidence_interval, analysis)
+            outliers_summary(distribution, analysis.score)
     except TypeError:
         st.error('The chosen column is not numeric. Please choose another column.')
 
 
+def confidence_interval_note(confidence_interval: bool, analysis: Analysis):
+    """
+    Explain on a streamlit app why the confidence intervals are not shaded, when they were asked for but not calculated.
+    :param confidence_interval: Whether the confidence intervals were asked for.
+    :param analysis: Analysis of the distribution.
+    :return: None
+    """
+    if confidence_interval and analysis.intervals is None:
+        st.caption(f'Confidence intervals are calculated up to {MAX_BOOTSTRAP_SIZE:,} values')
+
+
+def outliers_summary(distribution: pd.DataFrame, score: OutlierScore):
+    """
+    Display on a streamlit app how many data points are flagged, and how they compare with the actual outliers when
+    the distribution has some.
+    :param distribution: Dataframe with column 'Distribution' with values and column 'Type' with data type.
+    :param score: Flagged data points of the distribution.
+    :return: None
+    """
+    col_1, col_2, col_3 = st.columns(3)
+    col_1.metric('Below lower threshold', score.count_down)
+    col_2.metric('Above upper threshold', score.count_up)
+    col_3.metric('Flagged', f'{score.count} ({score.count / max(score.size, 1):.1%})')
+    if distribution['Type'].eq('Outliers').any():
+        st.dataframe(get_confusion_matrix(score, distribution['Type']))
+
+
+def fast_distribution_graph(distribution: pd.DataFrame, formula: Formula, confidence_interval: bool = False,
+                            analysis: Analysis = None):
+    """
+    Display a binned KDE plot on a streamlit app showing threshold calculated from an outlier detection formula.
+    Suited to large distributions, see get_binned_kde.
+    :param distribution: Dataframe with column 'Distribution' with values and column 'Type' with data type.
+    :param formula: Outlier detection formula
+    :param confidence_interval: Whether to shade the bootstrap confidence interval of each threshold
+    :param analysis: Thresholds and flagged points already calculated, for instance by a job. Calculated if not given.
+    :return: None
+    """
+    import altair as alt
+
+    try:
+        distribution_ndarray = distribution['Distribution'].to_numpy(dtype=float)
+        if analysis is None:
+            analysis = get_analysis(distribution_ndarray, formula, confidence_interval)
+        threshold = analysis.threshold
+
+        # Densities of each type are normalized together, like kdeplot's common_norm
+        with stage('kde'):
+            densities = []
+            for data_type, values in distribution.groupby('Type', sort=False, observed=True)['Distribution']:
+                grid, density = get_binned_kde(values.to_numpy(dtype=float))
+                densities.append(pd.DataFrame({'Value': grid, 'Density': density * len(values) / len(distribution),
+                                               'Type': data_type}))
+            density_df = pd.concat(densities)
+
+        area = alt.Chart(density_df).mark_area(opacity=0.4, line=True).encode(
+            x=alt.X('Value:Q', title='Value'), y=alt.Y('Density:Q', title='Density'),
+            color=alt.Color('Type:N', legend=alt.Legend(orient='top-right')))
+        rules = alt.Chart(pd.DataFrame({'Threshold': threshold})).mark_rule(color='blue', strokeDash=[6, 4]).encode(
+            x='Threshold:Q')
+        chart = area + rules
+        if analysis.intervals is not None:
+            intervals = pd.DataFrame(analysis.intervals, columns=['Lower', 'Upper'])
+            chart += alt.Chart(intervals).mark_rect(color='blue', opacity=0.15).encode(x='Lower:Q', x2='Upper:Q')
+
+        # Show graph
+        with st.container(border=True), stage('render'):
+            st.altair_chart(chart)
+            confidence_interval_note(confidence_interval, analysis)
+            outliers_summary(distribution, analysis.score)
+    except (TypeError, ValueError):
+        st.error('The chosen column is not numeric. Please choose another column.')
+
+
+def rolling_threshold_graph(values: np.ndarray | pd.Series, formula: Formula, window: int, bands: pd.DataFrame = None):
+    """
+    Display a time series on a streamlit app with the rolling thresholds calculated from an outlier detection formula.
+    :param values: Time-ordered values.
+    :param formula: Outlier detection formula
+    :param window: Number of rows of the rolling window
+    :param bands: Rolling thresholds already calculated, see get_rolling_threshold. Calculated if not given.
+    :return: None
+    """
+    import altair as alt
+
+    try:
+        series = np.asarray(values, dtype=float)
+        if bands is None:
+            bands = get_rolling_threshold(series, window, formula)
+        bands = bands.copy()
+    except (TypeError, ValueError):
+        st.error('The chosen column is not numeric. Please choose another column.')
+        return
+    bands.insert(0, 'Row', np.arange(series.size))
+    bands.insert(1, 'Value', series)
+
+    # Every outlier is plotted, the rest of the series is thinned out
+    step = -(-len(bands) // MAX_PLOTTED_ROWS)
+    plotted = bands.iloc[::step]
+    outliers = bands[bands['outlier']].iloc[:MAX_PLOTTED_ROWS]
+
+    band = alt.Chart(plotted).mark_area(opacity=0.3, color='blue').encode(
+        x=alt.X('Row:Q', title='Row'), y=alt.Y('thresh_down:Q', title='Value'), y2='thresh_up:Q')
+    line = alt.Chart(plotted).mark_line(strokeWidth=1).encode(x='Row:Q', y='Value:Q')
+    points = alt.Chart(outliers).mark_point(color='red', filled=True, size=20).encode(x='Row:Q', y='Value:Q')
+
+    with st.container(border=True):
+        st.altair_chart(band + line + points)
+        st.caption(f"{int(bands['outlier'].sum())} outliers over a rolling window of {window} rows")
+
+
+def grouped_threshold_graph(values: np.ndarray, groups: np.ndarray, formula: Formula, top: int = TOP_OFFENDERS,
+                            thresholds: pd.DataFrame = None):
+    """
+    Display the thresholds of every group of a column on a streamlit app, with a plot of the groups that have the most
+    outliers.
+    :param values: Values.
+    :param groups: Group key of each value.
+    :param formula: Outlier detection formula
+    :param top: Number of groups plotted
+    :param thresholds: Thresholds of every group already calculated, see get_grouped_thresholds. Calculated if not
+    given.
+    :return: None
+    """
+    import altair as alt
+
+    try:
+        values = np.asarray(values, dtype=float)
+        if thresholds is None:
+            with stage('grouped_threshold'):
+                thresholds = get_grouped_thresholds(values, groups, formula)
+    except (TypeError, ValueError):
+        st.error('The chosen column is not numeric. Please choose another column.')
+        return
+    offenders = thresholds.sort_values(['outliers', 'outlier_rate'], ascending=False, kind='stable')
+
+    with stage('kde'):
+        top_offenders = offenders[offenders['outliers'] > 0].head(top)
+        selected = pd.Index(top_offenders['group']).get_indexer(groups)
+        charts = []
+        for i, group in enumerate(top_offenders.itertuples()):
+            grid, density = get_binned_kde(values[selected == i])
+            area = alt.Chart(pd.DataFrame({'Value': grid, 'Density': density})).mark_area(
+                opacity=0.4, line=True).encode(x=alt.X('Value:Q', title='Value'), y=alt.Y('Density:Q', title='Density'))
+            rules = alt.Chart(pd.DataFrame({'Threshold': [group.thresh_down, group.thresh_up]})).mark_rule(
+                color='blue', strokeDash=[6, 4]).encode(x='Threshold:Q')
+            charts.append((area + rules).properties(title=f'{group.group} ({group.outliers} outliers)', width=180,
+                                                    height=120))
+
+    with st.container(border=True), stage('render'):
+        if charts:
+            st.altair_chart(alt.concat(*charts, columns=3))
+        st.caption(f"{int(thresholds['outliers'].sum())} outliers in {int((thresholds['outliers'] > 0).sum())} of "
+                   f"{len(thresholds)} groups")
+        st.dataframe(offenders, hide_index=True)
+
+
+def threshold_preview(column: SortedColumn, formula: Formula):
+    """
+    Display the histogram of a column with the thresholds of an outlier detection formula on a streamlit app, without
+    going over the values again, so that the preview follows every change of the formula.
+    :param column: Sorted column, see get_sorted_column.
+    :param formula: Outlier detection formula
+    :return: None
+    """
+    import altair as alt
+
+    thresh_down, thresh_up = column.threshold(formula)
+    count_down, count_up = column.count_outliers(thresh_down, thresh_up)
+    histogram = pd.DataFrame({'Start': column.edges[:-1], 'End': column.edges[1:], 'Count': column.counts})
+    bars = alt.Chart(histogram).mark_rect(opacity=0.6).encode(x=alt.X('Start:Q', title='Value'), x2='End:Q',
+                                                             y=alt.Y('Count:Q', title='Count'))
+    rules = alt.Chart(pd.DataFrame({'Threshold': [thresh_down, thresh_up]})).mark_rule(
+        color='blue', strokeDash=[6, 4]).encode(x='Threshold:Q')
+
+    with st.container(border=True):
+        st.altair_chart(bars + rules)
+        col_1, col_2, col_3 = st.columns(3)
+        col_1.metric('Below lower threshold', count_down, help=f'Lower threshold: {thresh_down:.4g}')
+        col_2.metric('Above upper threshold', count_up, help=f'Upper threshold: {thresh_up:.4g}')
+        col_3.metric('Flagged', f'{count_down + count_up} ({(count_down + count_up) / max(column.size, 1):.1%})')
+
+
 def get_plot_kind():
     """
     Allow user to select kind of plot from sidebar on a streamlit app.
     :return: Plot kind.
     """
-    plot_kind = st.sidebar.radio(label='Plot kind', options=['KDE Plot', 'Histogram'])
+    plot_kind = st.sidebar.radio(label='Plot kind', options=['KDE Plot', 'Fast KDE Plot', 'Histogram'],
+                                 help='Fast KDE Plot is suited to large distributions')
     return plot_kind
+
+
+def get_confidence_interval_choice() -> bool:
+    """
+    Allow user to choose from sidebar on a streamlit app whether to show the confidence intervals of the thresholds.
+    :return: Whether to show the confidence intervals.
+    """
+    return st.sidebar.checkbox('Confidence interval', help='Shade the 95% bootstrap confidence interval of each '
+                                                           'threshold, to see how noisy it is on small samples. '
+                                                           f'Calculated up to {MAX_BOOTSTRAP_SIZE:,} values.')
+
+
+def get_profiler() -> Profiler | None:
+    """
+    Allow user to turn on timings from sidebar on a streamlit app.
+    :return: Profiler of the page if timings are on, None otherwise.
+    """
+    with st.sidebar.expander('Debug'):
+        show_timings = st.checkbox('Show timings', help='Time each stage of the page')
+        trace_memory = st.checkbox('Trace memory', disabled=not show_timings,
+                                   help='Also measure the memory allocated by each stage, which slows the page down')
+    return Profiler(trace_memory=trace_memory) if show_timings else None
+
+
+def profiling_panel(profiler: Profiler | None, page: str):
+    """
+    Display the timings collected by a profiler in a collapsible panel on a streamlit app, and export them as JSON lines
+    if the OUTLIERS_PROFILE_PATH environment variable is set.
+    :param profiler: Profiler of the page, or None if timings are off.
+    :param page: Name of the page, added to the exported records.
+    :return: None
+    """
+    if profiler is None:
+        return
+    if os.environ.get(PROFILE_PATH_VARIABLE):
+        profiler.export_jsonl(os.environ[PROFILE_PATH_VARIABLE], page=page)
+    with st.expander('Timings'):
+        st.dataframe(profiler.to_dataframe(), hide_index=True)
+
+
+@st.cache_resource(max_entries=4, show_spinner='Reading the file')
+def read_uploaded_table(file_id: str, _file) -> pa.Table:
+    """
+    Parse an uploaded file once. The table is shared by every rerun and session until another file is uploaded.
+    :param file_id: Identifier of the upload, which keys the cache.
+    :param _file: Uploaded file.
+    :return: Arrow table.
+    """
+    return read_table_bytes(_file.getvalue(), _file.name)
+
+
+@st.cache_resource(max_entries=8, show_spinner='Sorting the column')
+def get_sorted_column(file_id: str, column: str, _values: np.ndarray) -> SortedColumn:
+    """
+    Sort a column of an uploaded file once, for the threshold preview.
+    :param file_id: Identifier of the upload, which keys the cache with the column name.
+    :param column: Name of the column.
+    :param _values: Values of the column.
+    :return: Sorted column.
+    """
+    return SortedColumn(_values)
+
+
+@st.cache_resource(max_entries=16)
+def get_upload_fingerprint(file_id: str, _file) -> str:
+    """
+    Fingerprint the content of an uploaded file once, so that jobs on identical files are shared across sessions.
+    :param file_id: Identifier of the upload, which keys the cache.
+    :param _file: Uploaded file.
+    :return: Fingerprint of the file.
+    """
+    return get_data_fingerprint(np.frombuffer(_file.getvalue(), dtype=np.uint8))
+
+
+def get_session_id() -> str:
+    """
+    Get the identifier of the session of a streamlit app, under which its jobs are submitted.
+    :return: Identifier of the session.
+    """
+    if 'session_id' not in st.session_state:
+        st.session_state['session_id'] = uuid.uuid4().hex
+    return st.session_state['session_id']
+
+
+def submit_job(key: str, func: Callable, profiler: Profiler = None, **kwargs):
+    """
+    Run a job in the background for the session, as a button callback. See JobManager.submit.
+    :param key: Fingerprint of the job inputs, see make_job_key.
+    :param func: Job function.
+    :param profiler: Profiler of the page if timings are on. The job is timed by a new profiler with the same
+    settings, the page profiler holding the records of its own run.
+    :param kwargs: Keyword arguments of the job function.
+    :return: None
+    """
+    job_profiler = None if profiler is None else Profiler(trace_memory=profiler.trace_memory)
+    job_manager.submit(get_session_id(), key, func, profiler=job_profiler, **kwargs)
+
+
+@st.fragment(run_every=PROGRESS_INTERVAL)
+def job_progress(job: Job):
+    """
+    Display the progress of a job on a streamlit app, refreshed until the job is done, then rerun the app.
+    :param job: Running job.
+    :return: None
+    """
+    if job.done():
+        st.rerun()
+    st.progress(job.progress, text=job.message or 'Waiting for a worker')
+
+
+def show_job(key: str, render: Callable, profiler: Profiler = None):
+    """
+    Display the progress of the job of the session on a streamlit app, then its result once it is done. A job whose
+    inputs have changed since it was submitted is released, which cancels it unless another session follows it. The
+    result of a finished job is moved to the session state, where it lives as long as the session and its inputs.
+    :param key: Fingerprint of the current inputs, see make_job_key. None if there is nothing to compute, for instance
+    before a file is uploaded.
+    :param render: Function displaying the result of the job.
+    :param profiler: Profiler of the page, to which the timings of the job are added.
+    :return: None
+    """
+    session_id = get_session_id()
+    if key is None:
+        job_manager.release(session_id)
+        st.session_state.pop(JOB_RESULT_KEY, None)
+        return
+    job = job_manager.get(session_id)
+    if job is not None and job.key != key:
+        job_manager.release(session_id)
+    elif job is not None:
+        if not job.done():
+            job_progress(job)
+            return
+        job_manager.release(session_id)
+        st.session_state.pop(JOB_RESULT_KEY, None)
+        try:
+            st.session_state[JOB_RESULT_KEY] = key, job.result()
+        except JobCancelled:
+            return
+        except Exception:
+            st.error('Something went wrong')
+            return
+        if profiler is not None and job.profiler is not None:
+            profiler.records.extend(job.profiler.records)
+
+    if JOB_RESULT_KEY not in st.session_state:
+        return
+    result_key, result = st.session_state[JOB_RESULT_KEY]
+    if result_key != key:
+        # The inputs have changed, the result is not shown anymore
+        st.session_state.pop(JOB_RESULT_KEY, None)
+        return
+    render(result)
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from distributions.core import get_labelled_distribution, get_outlier_amount
+
+# Every distribution shape is a mixture of (weight, family, parameters) components, calibrated on
+# data/distributions.csv. A skewnorm with alpha 0 is a normal distribution.
+DISTRIBUTION_COMPONENTS = {
+    'normal': [(1., 'skewnorm', {'alpha': 0., 'loc': 0.5, 'scale': 0.123})],
+    'asymmetrical': [(1., 'skewnorm', {'alpha': 20., 'loc': 0.024, 'scale': 0.248})],
+    'bimodal': [(0.34, 'skewnorm', {'alpha': 20., 'loc': 0., 'scale': 0.27}),
+                (0.66, 'skewnorm', {'alpha': -20., 'loc': 1., 'scale': 0.31})],
+    'sharp': [(1., 't', {'df': 5., 'loc': 0.5, 'scale': 0.08})],
+    'flat': [(1., 'uniform', {'low': 0., 'high': 1.})],
+}
+# Range of the distribution values, values drawn outside of it are drawn again
+DISTRIBUTION_RANGE = (0., 1.)
+# Outliers are uniform over a range given by their spread and distance, calibrated on data/outliers.csv. Outliers on
+# two sides are mirrored around the center of the distributions on the lower side for half of them.
+OUTLIERS_RANGES = {('centered', 'extreme'): (9.5, 10.), ('centered', 'close'): (1.5, 2.),
+                   ('dispersed', 'extreme'): (7., 10.), ('dispersed', 'close'): (1.5, 4.5)}
+MIRROR_CENTER = 0.5
+
+
+def _sample_component(rng: np.random.Generator, family: str, size: int, parameters: dict) -> np.ndarray:
+    """
+    Draw values from a distribution family with NumPy only.
+    :param rng: Random generator.
+    :param family: 'skewnorm', 't' or 'uniform'.
+    :param size: Number of values.
+    :param parameters: Parameters of the family, see DISTRIBUTION_COMPONENTS.
+    :return: Drawn values.
+    """
+    if family == 'skewnorm':
+        # Azzalini's construction from two standard normal draws
+        delta = parameters['alpha'] / np.sqrt(1 + parameters['alpha'] ** 2)
+        u_0, u_1 = rng.standard_normal((2, size))
+        return parameters['loc'] + parameters['scale'] * (delta * np.abs(u_0) + np.sqrt(1 - delta ** 2) * u_1)
+    if family == 't':
+        return parameters['loc'] + parameters['scale'] * rng.standard_t(parameters['df'], size)
+    if family == 'uniform':
+        return rng.uniform(parameters['low'], parameters['high'], size)
+    raise ValueError(f'Unknown distribution family {family}')
+
+
+def _sample_mixture(rng: np.random.Generator, components: list[tuple[float, str, dict]], size: int) -> np.ndarray:
+    """
+    Draw values from a mixture, the number of values of each component being drawn from a multinomial.
+    :param rng: Random generator.
+    :param components: (weight, family, parameters) of each component.
+    :param size: Number of values.
+    :return: Drawn values, shuffled.
+    """
+    sizes = rng.multinomial(size, [weight for weight, _, _ in components])
+    values = np.concatenate([_sample_component(rng, family, component_size, parameters)
+                             for (_, family, parameters), component_size in zip(components, sizes)])
+    if len(components) > 1:
+        rng.shuffle(values)
+    return values
+
+
+def generate_distribution_values(shape: str, size: int, seed: int | np.random.Generator = None) -> np.ndarray:
+    """
+    Generate the values of a distribution shape.
+    :param shape: One of Distribution.DISTRIBUTION_SHAPES.
+    :param size: Number of values.
+    :param seed: Seed or random generator, for reproducible values.
+    :return: Values within DISTRIBUTION_RANGE.
+    """
+    if shape not in DISTRIBUTION_COMPONENTS:
+        raise ValueError(f'Unknown distribution shape {shape}')
+    rng = np.random.default_rng(seed)
+    low, high = DISTRIBUTION_RANGE
+    values = _sample_mixture(rng, DISTRIBUTION_COMPONENTS[shape], size)
+    # Values out of range are drawn again until every value is in range, a few values at a time
+    outside = np.flatnonzero((values < low) | (values > high))
+    while outside.size:
+        values[outside] = _sample_mixture(rng, DISTRIBUTION_COMPONENTS[shape], outside.size)
+        outside = outside[(values[outside] < low) | (values[outside] > high)]
+    return values
+
+
+def generate_outliers_values(shape: str, size: int, seed: int | np.random.Generator = None) -> np.ndarray:
+    """
+    Generate the values of an outliers shape.
+    :param shape: One of Distribution.OUTLIERS_SHAPES, like 'outlier_2_side_dispersed_close'.
+    :param size: Number of values.
+    :param seed: Seed or random generator, for reproducible values.
+    :return: Generated outliers.
+    """
+    try:
+        _, sides, _, spread, distance = shape.split('_')
+        low, high = OUTLIERS_RANGES[(spread, distance)]
+    except (ValueError, KeyError):
+        raise ValueError(f'Unknown outliers shape {shape}')
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(low, high, size)
+    if sides == '2':
+        lower_side = rng.random(size) < 0.5
+        values[lower_side] = 2 * MIRROR_CENTER - values[lower_side]
+    return values
+
+
+def generate_full_distribution(distribution_shape: str, n_distribution: int, outliers_shape: str,
+                               outliers_rate: float, seed: int = None) -> pd.DataFrame:
+    """
+    Get Dataframe of a generated distribution with outliers, from desired shapes, length and outliers rate.
+    Unlike get_full_distribution, the size is not bounded by the reference datasets.
+    :param distribution_shape: One of Distribution.DISTRIBUTION_SHAPES.
+    :param n_distribution: Length of the distribution
+    :param outliers_shape: One of Distribution.OUTLIERS_SHAPES.
+    :param outliers_rate: Rate of outliers to be added to the initial distribution
+    :param seed: Seed of the generation, for reproducible distributions
+    :return: Dataframe with column 'Distribution' including values of distribution and outliers, and column 'Type'
+    indicating if each datapoint is a valid data point or an outlier.
+    """
+    rng = np.random.default_rng(seed)
+    outlier_amount = get_outlier_amount(n_distribution, outliers_rate)
+    values = np.concatenate([generate_distribution_values(distribution_shape, n_distribution, rng),
+                             generate_outliers_values(outliers_shape, outlier_amount, rng)])
+    return get_labelled_distribution(values, n_distribution)
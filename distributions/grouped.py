@@ -0,0 +1,126 @@
+from typing import Callable
+import numpy as np
+import pandas as pd
+from distributions.batch import STATS, get_thresholds_from_stats_matrix
+from distributions.core import ADJUSTED_MAD_SCALE
+from distributions.models import Formula
+
+
+def _get_segment_percentile(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray,
+                            q: float) -> np.ndarray:
+    """
+    Calculate a percentile of every segment of an array sorted within segments, with linear interpolation.
+    :param sorted_values: Values sorted within each segment.
+    :param starts: Index of the first value of each segment.
+    :param counts: Number of values of each segment, at least 1.
+    :param q: Percentile, between 0 and 1.
+    :return: Percentile of each segment.
+    """
+    position = q * (counts - 1)
+    below = np.floor(position).astype(np.intp)
+    fraction = position - below
+    above = np.minimum(below + 1, counts - 1)
+    lower, upper = sorted_values[starts + below], sorted_values[starts + above]
+    return lower + (upper - lower) * fraction
+
+
+def _argsort_segments(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    Sort by segment code then by value. An argsort of the values followed by a stable argsort of the codes is about
+    twice as fast as np.lexsort.
+    :param values: Values.
+    :param codes: Segment code of each value.
+    :return: Indices that sort the values by segment then by value.
+    """
+    order = np.argsort(values)
+    return order[np.argsort(codes[order], kind='stable')]
+
+
+def _sort_segments(values: np.ndarray, groups: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                                                                     np.ndarray]:
+    """
+    Sort values by group then by value in a single pass, so that each group is a contiguous sorted segment.
+    :param values: Input data. NaNs are ignored.
+    :param groups: Group key of each value. Missing keys are ignored.
+    :return: keys (np.ndarray): Key of each segment, sorted. Groups without any value are left out.
+    sorted_values (np.ndarray): Values sorted by segment then by value.
+    sorted_codes (np.ndarray): Segment of each sorted value.
+    counts (np.ndarray): Number of values of each segment.
+    starts (np.ndarray): Index of the first value of each segment.
+    """
+    codes, keys = pd.factorize(np.asarray(groups).ravel(), sort=True)
+    valid = np.flatnonzero((codes >= 0) & ~np.isnan(values))
+    order = valid[_argsort_segments(values[valid], codes[valid])]
+    sorted_values = values[order]
+    # Groups that keep at least one value are renumbered from 0
+    counts = np.bincount(codes[order], minlength=len(keys))
+    present = counts > 0
+    sorted_codes = (np.cumsum(present) - 1)[codes[order]]
+    counts = counts[present]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp)
+    return np.asarray(keys)[present], sorted_values, sorted_codes, counts, starts
+
+
+def _get_segment_stats(sorted_values: np.ndarray, sorted_codes: np.ndarray, counts: np.ndarray,
+                       starts: np.ndarray) -> np.ndarray:
+    """
+    Calculate the statistics of every segment of values sorted within segments, see _sort_segments.
+    :return: Array of shape (number of segments, len(STATS)) with the statistics in the order of STATS.
+    """
+    if counts.size == 0:
+        return np.empty((0, len(STATS)))
+    median = _get_segment_percentile(sorted_values, starts, counts, 0.5)
+    q1 = _get_segment_percentile(sorted_values, starts, counts, 0.25)
+    q3 = _get_segment_percentile(sorted_values, starts, counts, 0.75)
+    mean = np.add.reduceat(sorted_values, starts) / counts
+    deviations = sorted_values - np.repeat(mean, counts)
+    # The SD of a single value is NaN, like np.std with ddof=1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sd = np.sqrt(np.add.reduceat(deviations * deviations, starts) / (counts - 1))
+
+    absolute_deviations = np.abs(sorted_values - np.repeat(median, counts))
+    absolute_deviations = absolute_deviations[_argsort_segments(absolute_deviations, sorted_codes)]
+    raw_mad = _get_segment_percentile(absolute_deviations, starts, counts, 0.5)
+    return np.stack([median, q1, q3, mean, raw_mad * ADJUSTED_MAD_SCALE, raw_mad * 1.4826, q3 - q1, sd], axis=-1)
+
+
+def get_grouped_stats(values: np.ndarray, groups: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate the statistics used by the outlier detection formulas for every group of a column at once.
+    Once values are sorted by group then by value, the quartiles and medians of every group are read at computed
+    offsets and the sums are segment reductions. The MAD takes a second sort of the absolute deviations. The cost
+    does not depend on the number of groups.
+    :param values: Input data. NaNs are ignored.
+    :param groups: Group key of each value. Missing keys are ignored.
+    :return: keys (np.ndarray): Key of each group, sorted. Groups without any value are left out.
+    stats (np.ndarray): Array of shape (number of groups, len(STATS)) with the statistics in the order of STATS.
+    counts (np.ndarray): Number of values of each group.
+    """
+    keys, sorted_values, sorted_codes, counts, starts = _sort_segments(np.asarray(values, dtype=float).ravel(), groups)
+    return keys, _get_segment_stats(sorted_values, sorted_codes, counts, starts), counts
+
+
+def get_grouped_thresholds(values: np.ndarray, groups: np.ndarray, formula: Formula,
+                           progress: Callable = None) -> pd.DataFrame:
+    """
+    Calculate the outlier detection thresholds of every group of a column, for instance per device or per site, in a
+    single sort-based pass, see get_grouped_stats.
+    :param values: Input data. NaNs are ignored.
+    :param groups: Group key of each value. Missing keys are ignored.
+    :param formula: Outlier detection formula.
+    :param progress: Called with the fraction of the calculation done, after each sort. An exception it raises, like
+    JobCancelled, stops the calculation.
+    :return: Dataframe with columns 'group', 'count', 'thresh_down', 'thresh_up', 'outliers' and 'outlier_rate', one
+    row per group, in the order of the sorted keys.
+    """
+    progress = progress or (lambda *_: None)
+    keys, sorted_values, sorted_codes, counts, starts = _sort_segments(np.asarray(values, dtype=float).ravel(), groups)
+    progress(0.5)
+    stats = _get_segment_stats(sorted_values, sorted_codes, counts, starts)
+    progress(0.9)
+    thresholds = get_thresholds_from_stats_matrix(stats, [formula])[:, 0, :]
+
+    flagged = ((sorted_values < thresholds[sorted_codes, 0]) | (sorted_values > thresholds[sorted_codes, 1]))
+    outliers = np.bincount(sorted_codes, weights=flagged, minlength=len(keys)).astype(int)
+    return pd.DataFrame({'group': keys, 'count': counts, 'thresh_down': thresholds[:, 0],
+                         'thresh_up': thresholds[:, 1], 'outliers': outliers, 'outlier_rate': outliers / counts})
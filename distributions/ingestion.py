@@ -0,0 +1,96 @@
+import csv
+import os
+import re
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+CSV_EXTENSIONS = ('.csv', '.tsv', '.txt')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+UPLOAD_TYPES = [extension[1:] for extension in CSV_EXTENSIONS + PARQUET_EXTENSIONS + ARROW_EXTENSIONS]
+# Number of bytes at the start of a CSV used to detect its dialect
+SNIFF_BYTES = 1 << 16
+DELIMITERS = ',;\t|'
+
+
+def sniff_csv_dialect(sample: bytes) -> tuple[str, str]:
+    """
+    Detect the values separator and the decimal point of a CSV from its first bytes.
+    :param sample: First bytes of the CSV.
+    :return: separator (str): Values separator, ',' if it can not be detected.
+    decimal (str): Decimal point, ',' if the separator is not a comma and values look like '1,5', '.' otherwise.
+    """
+    text = sample.decode('utf-8', errors='replace')
+    # The last line of a truncated sample is incomplete
+    if len(sample) >= SNIFF_BYTES and '\n' in text:
+        text = text[:text.rindex('\n')]
+    try:
+        separator = csv.Sniffer().sniff(text, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        separator = ','
+    decimal = ',' if separator != ',' and re.search(r'\d,\d', text) else '.'
+    return separator, decimal
+
+
+def read_table_bytes(data: bytes, name: str) -> pa.Table:
+    """
+    Parse an uploaded file into an Arrow table, with a single chunk per column.
+    :param data: Content of the file.
+    :param name: Name of the file. Its extension gives the format: Parquet (.parquet, .pq), Feather or Arrow IPC file
+    or stream (.feather, .arrow, .ipc), CSV otherwise, with its dialect detected from the first bytes.
+    :return: Arrow table.
+    """
+    extension = os.path.splitext(name.lower())[1]
+    if extension in PARQUET_EXTENSIONS:
+        table = pq.read_table(pa.BufferReader(data))
+    elif extension in ARROW_EXTENSIONS:
+        try:
+            table = feather.read_table(pa.BufferReader(data))
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_stream(data).read_all()
+    else:
+        separator, decimal = sniff_csv_dialect(data[:SNIFF_BYTES])
+        table = pa_csv.read_csv(pa.BufferReader(data), parse_options=pa_csv.ParseOptions(delimiter=separator),
+                                convert_options=pa_csv.ConvertOptions(decimal_point=decimal))
+    # Columns are made contiguous once, so that selecting a column does not copy it
+    return table.combine_chunks()
+
+
+def get_numeric_columns(table: pa.Table) -> list[str]:
+    """
+    List the numeric columns of a table from its schema.
+    :param table: Arrow table.
+    :return: Names of the integer, floating point and decimal columns.
+    """
+    return [field.name for field in table.schema
+            if pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or pa.types.is_decimal(field.type)]
+
+
+def get_column_values(table: pa.Table, column: str) -> np.ndarray:
+    """
+    Get the values of a numeric column as floats.
+    :param table: Arrow table.
+    :param column: Name of the column.
+    :return: Read-only view of the Arrow buffer for a float64 column without nulls in a single chunk, converted copy
+    with NaNs for nulls otherwise.
+    """
+    values = table.column(column)
+    if pa.types.is_float64(values.type) and values.num_chunks == 1 and values.null_count == 0:
+        return values.chunk(0).to_numpy(zero_copy_only=True)
+    return values.cast(pa.float64()).to_numpy()
+
+
+def get_column_keys(table: pa.Table, column: str) -> np.ndarray:
+    """
+    Get the values of a column of any type, for instance to group by it.
+    :param table: Arrow table.
+    :param column: Name of the column.
+    :return: Values of the column, with dictionary columns decoded and nulls as None or NaN.
+    """
+    keys = table.column(column)
+    if pa.types.is_dictionary(keys.type):
+        keys = keys.cast(keys.type.value_type)
+    return keys.to_numpy()
@@ -0,0 +1,220 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable
+import numpy as np
+from pydantic import BaseModel
+from distributions.bootstrap import MAX_BOOTSTRAP_SIZE, MAX_BOOTSTRAP_WORKERS, get_bootstrap_threshold
+from distributions.cache import get_data_fingerprint
+from distributions.core import get_cached_formula_threshold, score_outliers
+from distributions.models import Analysis, Formula
+from distributions.profiling import Profiler, stage
+
+# Number of seconds a finished job is kept for its sessions to collect its result, after which it is dropped, for
+# instance when its sessions have ended
+FINISHED_JOB_TTL = 60.
+
+
+class JobCancelled(Exception):
+    """
+    Raised in a job when it has been cancelled, at its next progress report.
+    """
+
+
+class Job:
+    """
+    Computation running in the shared pool. It is cancelled cooperatively: the job function reports its progress, and
+    the report raises JobCancelled once nobody waits for the result anymore.
+    """
+
+    def __init__(self, key: str, profiler: Profiler = None):
+        self.key = key
+        self.profiler = profiler
+        self.progress = 0.
+        self.message = ''
+        self.sessions = set()
+        self.finished_at: float = None
+        self.future: Future = None
+        self._cancelled = threading.Event()
+
+    def report(self, progress: float, message: str = ''):
+        """
+        Report the progress of the job, and stop it if it has been cancelled. Passed to the job function.
+        :param progress: Fraction of the job done, between 0 and 1.
+        :param message: Step of the job. The previous step is kept if empty, so that the functions run by a job can
+        report a fraction only.
+        :return: None
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled(self.key)
+        self.progress, self.message = progress, message or self.message
+
+    def cancel(self):
+        self._cancelled.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: float = None):
+        """
+        Wait for the result of the job.
+        :param timeout: Number of seconds to wait, forever by default.
+        :return: Value returned by the job function. Raises JobCancelled if the job was cancelled, or the exception
+        raised by the job function.
+        """
+        if self.future.cancelled():
+            raise JobCancelled(self.key)
+        return self.future.result(timeout)
+
+
+class JobManager:
+    """
+    Run jobs in a pool of threads shared by every session, so that heavy computations do not block the script thread.
+    Jobs are keyed by the fingerprint of their inputs: a session submitting a job identical to one in flight waits for
+    that job instead of starting another. Each session follows a single job, and a job that no session follows anymore
+    is cancelled. A finished job is kept until its sessions collect its result, for FINISHED_JOB_TTL seconds at most:
+    results are meant to be kept by the sessions. NumPy releases the GIL in its sorts, selections and reductions, so
+    threads run them in parallel without copying the inputs to other processes.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers
+        self._executor = None
+        self._in_flight = {}
+        self._session_jobs = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created on first use, so that importing the module does not start threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='outliers-job')
+        return self._executor
+
+    def submit(self, session_id: str, key: str, func: Callable, *args, profiler: Profiler = None, **kwargs) -> Job:
+        """
+        Run a job for a session, or follow the identical job in flight. The previous job of the session is released.
+        A finished job is run again, for instance to draw another sample.
+        :param session_id: Identifier of the session.
+        :param key: Fingerprint of the job inputs, see make_job_key.
+        :param func: Job function, called with args, kwargs and a progress keyword argument, see Job.report.
+        :param profiler: Profiler timing the stages of the job, if it is started by this call.
+        :return: Job followed by the session.
+        """
+        with self._lock:
+            self._expire()
+            job = self._session_jobs.get(session_id)
+            if job is not None and job.key == key and not job.cancelled and not job.done():
+                return job
+            self._release(session_id)
+            job = self._in_flight.get(key)
+            if job is None:
+                job = Job(key, profiler)
+                self._in_flight[key] = job
+                job.future = self.executor.submit(self._run, job, func, args, kwargs)
+            job.sessions.add(session_id)
+            self._session_jobs[session_id] = job
+        return job
+
+    def get(self, session_id: str) -> Job | None:
+        """
+        Get the last job of a session.
+        :param session_id: Identifier of the session.
+        :return: Last job submitted by the session, None if there is none, it has been released or it has expired.
+        """
+        with self._lock:
+            self._expire()
+            return self._session_jobs.get(session_id)
+
+    def release(self, session_id: str):
+        """
+        Stop following the job of a session, for instance when its inputs have changed. The job is cancelled if no
+        other session follows it.
+        :param session_id: Identifier of the session.
+        :return: None
+        """
+        with self._lock:
+            self._release(session_id)
+
+    def _release(self, session_id: str):
+        job = self._session_jobs.pop(session_id, None)
+        if job is None:
+            return
+        job.sessions.discard(session_id)
+        if not job.sessions and not job.done():
+            job.cancel()
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+    def _expire(self):
+        expired_before = time.monotonic() - FINISHED_JOB_TTL
+        for session_id, job in list(self._session_jobs.items()):
+            if job.finished_at is not None and job.finished_at < expired_before:
+                self._release(session_id)
+
+    def _run(self, job: Job, func: Callable, args: tuple, kwargs: dict):
+        start = time.perf_counter()
+        try:
+            with job.profiler or nullcontext(), stage('job'):
+                return func(*args, progress=job.report, **kwargs)
+        finally:
+            job.progress, job.message = 1., f'Done in {time.perf_counter() - start:.1f}s'
+            job.finished_at = time.monotonic()
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+
+
+def make_job_key(*inputs) -> str:
+    """
+    Fingerprint the inputs of a job. Arrays are hashed by content, models by field values.
+    :param inputs: Inputs of the job.
+    :return: Key of the job.
+    """
+    parts = []
+    for job_input in inputs:
+        if isinstance(job_input, np.ndarray):
+            parts.append(get_data_fingerprint(job_input))
+        elif isinstance(job_input, BaseModel):
+            parts.append(repr(sorted(job_input.model_dump().items())))
+        else:
+            parts.append(repr(job_input))
+    return get_data_fingerprint(np.frombuffer('\x1f'.join(parts).encode(), dtype=np.uint8))
+
+
+def get_analysis(data: np.ndarray, formula: Formula, confidence_interval: bool = False,
+                 progress: Callable = None) -> Analysis:
+    """
+    Calculate everything shown with a distribution: thresholds, bootstrap confidence intervals and flagged points.
+    :param data: Input data.
+    :param formula: Outlier detection formula.
+    :param confidence_interval: Whether to calculate the bootstrap confidence interval of each threshold. Skipped
+    above MAX_BOOTSTRAP_SIZE values, where the intervals are narrow and the resampling takes minutes.
+    :param progress: Progress callback, see Job.report.
+    :return: Analysis of the data.
+    """
+    progress = progress or (lambda *_: None)
+    values = np.asarray(data, dtype=float)
+    progress(0.5, 'Calculating the thresholds')
+    with stage('threshold'):
+        threshold = get_cached_formula_threshold(values, formula)
+    intervals = None
+    if confidence_interval and values.size <= MAX_BOOTSTRAP_SIZE:
+        progress(0.6, 'Bootstrapping the thresholds')
+        with stage('bootstrap'):
+            intervals = get_bootstrap_threshold(
+                values, formula, seed=0, workers=MAX_BOOTSTRAP_WORKERS,
+                progress=lambda fraction: progress(0.6 + 0.3 * fraction, 'Bootstrapping the thresholds'))
+    progress(0.9, 'Flagging the outliers')
+    with stage('score'):
+        score = score_outliers(values, *threshold)
+    return Analysis(threshold=threshold, intervals=intervals, score=score)
+
+
+job_manager = JobManager()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import ClassVar
 import pandas as pd
+import numpy as np
 
 
 class Formula(BaseModel):
@@ -15,17 +16,59 @@ class Formula(BaseModel):
     sd_constant: float = Field(default=0.0)
 
 
+class RobustStats(BaseModel):
+    count: int = Field(default=0)
+    median: float = Field(default=np.nan)
+    q1: float = Field(default=np.nan)
+    q3: float = Field(default=np.nan)
+    mean: float = Field(default=np.nan)
+    sd: float = Field(default=np.nan)
+    mad: float = Field(default=np.nan)
+    adjusted_mad: float = Field(default=np.nan)
+
+    @property
+    def iqr(self) -> float:
+        return self.q3 - self.q1
+
+
+class OutlierScore(BaseModel):
+    size: int = Field(default=0)
+    count_down: int = Field(default=0)
+    count_up: int = Field(default=0)
+    packed_mask: np.ndarray = Field(default=None)
+    indices: np.ndarray = Field(default=None)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def count(self) -> int:
+        return self.count_down + self.count_up
+
+    @property
+    def mask(self) -> np.ndarray:
+        return np.unpackbits(self.packed_mask, count=self.size).astype(bool)
+
+
+class Analysis(BaseModel):
+    threshold: tuple[float, float] = Field(default=None)
+    intervals: tuple[tuple[float, float], tuple[float, float]] | None = Field(default=None)
+    score: OutlierScore = Field(default=None)
+
+
 class Distribution(BaseModel):
     DISTRIBUTION_SHAPES: ClassVar[str] = ['normal', 'asymmetrical', 'bimodal', 'sharp', 'flat']
     OUTLIERS_SHAPES: ClassVar[str] = ['outlier_1_side_centered_extreme', 'outlier_1_side_centered_close',
                                       'outlier_1_side_dispersed_extreme', 'outlier_1_side_dispersed_close',
                                       'outlier_2_side_centered_extreme', 'outlier_2_side_centered_close',
                                       'outlier_2_side_dispersed_extreme', 'outlier_2_side_dispersed_close']
+    DATA_TYPES: ClassVar[str] = ['Valid data points', 'Outliers']
     data: pd.DataFrame = Field(default=None)
     distribution_shape: str = Field(default=None)
     distribution_size: int = Field(default=None)
     outliers_shape: str = Field(default=None)
     outliers_rate: float = Field(default=None)
+    generated: bool = Field(default=False)
 
     class Config:
         arbitrary_types_allowed = True
@@ -0,0 +1,140 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from distributions.models import Distribution, Formula
+from distributions.batch import get_stats_matrix, get_thresholds_from_stats_matrix
+from distributions.datasets import get_distribution_values, get_outliers_values
+from distributions.generation import generate_distribution_values, generate_outliers_values
+from distributions.core import get_outlier_amount
+
+# Number of replicates scored at once, which bounds the memory used by the outlier flags
+REPLICATES_CHUNK_SIZE = 256
+
+
+def sample_replicates(values: np.ndarray, size: int, replicates: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw many samples without replacement from the same values at once. Samples of all the values are the values
+    themselves, which do not vary between replicates.
+    :param values: Values to sample from.
+    :param size: Number of values of each sample.
+    :param replicates: Number of samples.
+    :param rng: Random generator.
+    :return: Array of shape (replicates, size).
+    """
+    if size > values.size:
+        raise ValueError(f"Cannot take a larger sample than the {values.size} available values. Given {size = }")
+    if size == values.size:
+        return np.broadcast_to(values, (replicates, size))
+    # The indices of the smallest random keys of each row are a sample without replacement
+    indices = np.argpartition(rng.random((replicates, values.size)), size, axis=1)[:, :size]
+    return values[indices]
+
+
+def draw_replicates(distribution_shape: str, outliers_shape: str, distribution_size: int, outlier_amount: int,
+                    replicates: int, rng: np.random.Generator, generated: bool = False) -> np.ndarray:
+    """
+    Draw the values of many simulated distributions of the same parameters at once.
+    :param distribution_shape: Shape of the distribution, one of Distribution.DISTRIBUTION_SHAPES.
+    :param outliers_shape: Shape of the outliers, one of Distribution.OUTLIERS_SHAPES.
+    :param distribution_size: Number of valid data points of each distribution.
+    :param outlier_amount: Number of outliers of each distribution.
+    :param replicates: Number of distributions.
+    :param rng: Random generator.
+    :param generated: Whether to draw from the parametric shapes, see distributions.generation, instead of sampling
+    the reference datasets. Needed for sizes that are not below the 1000 reference values.
+    :return: Array of shape (replicates, distribution_size + outlier_amount), valid data points first.
+    """
+    if generated:
+        # Values are drawn independently, so a single draw is split into the replicates
+        return np.concatenate([
+            generate_distribution_values(distribution_shape, replicates * distribution_size, rng).reshape(
+                replicates, distribution_size),
+            generate_outliers_values(outliers_shape, replicates * outlier_amount, rng).reshape(replicates,
+                                                                                               outlier_amount)],
+            axis=1)
+    return np.concatenate([sample_replicates(get_distribution_values(distribution_shape), distribution_size,
+                                             replicates, rng),
+                           sample_replicates(get_outliers_values(outliers_shape), outlier_amount, replicates, rng)],
+                          axis=1)
+
+
+def score_cell(distribution_shape: str, outliers_shape: str, outliers_rate: float, distribution_size: int,
+               formulas: list[Formula], replicates: int, seed: np.random.SeedSequence,
+               generated: bool = False) -> np.ndarray:
+    """
+    Score outlier detection formulas on many simulated distributions of the same parameters.
+    :param distribution_shape: Shape of the distribution, one of Distribution.DISTRIBUTION_SHAPES.
+    :param outliers_shape: Shape of the outliers, one of Distribution.OUTLIERS_SHAPES.
+    :param outliers_rate: Rate of outliers in the simulated distributions.
+    :param distribution_size: Number of valid data points of the simulated distributions.
+    :param formulas: Outlier detection formulas.
+    :param replicates: Number of simulated distributions.
+    :param seed: Seed of the simulations.
+    :param generated: Whether to draw from the parametric shapes instead of sampling the reference datasets.
+    :return: Array of shape (number of formulas, 3) with the true positives, false positives and false negatives of
+    each formula, summed over the replicates.
+    """
+    rng = np.random.default_rng(seed)
+    outlier_amount = get_outlier_amount(distribution_size, outliers_rate)
+
+    counts = np.zeros((len(formulas), 3), dtype=np.int64)
+    for start in range(0, replicates, REPLICATES_CHUNK_SIZE):
+        chunk_size = min(REPLICATES_CHUNK_SIZE, replicates - start)
+        values = draw_replicates(distribution_shape, outliers_shape, distribution_size, outlier_amount, chunk_size,
+                                 rng, generated)
+        thresholds = get_thresholds_from_stats_matrix(get_stats_matrix(values, axis=1), formulas)
+        flagged = ((values[:, np.newaxis, :] < thresholds[..., 0, np.newaxis])
+                   | (values[:, np.newaxis, :] > thresholds[..., 1, np.newaxis]))
+        true_positives = flagged[..., distribution_size:].sum(axis=(0, 2))
+        counts[:, 0] += true_positives
+        counts[:, 1] += flagged[..., :distribution_size].sum(axis=(0, 2))
+        counts[:, 2] += chunk_size * outlier_amount - true_positives
+    return counts
+
+
+def run_formula_benchmark(formulas: list[Formula], distribution_shapes: list[str] = None,
+                          outliers_shapes: list[str] = None, outliers_rates: list[float] = (0.05, 0.1, 0.2),
+                          distribution_sizes: list[int] = (100, 250, 500), replicates: int = 1000, seed: int = None,
+                          workers: int = None, generated: bool = False) -> pd.DataFrame:
+    """
+    Measure the accuracy of outlier detection formulas with Monte-Carlo simulations over a grid of distribution
+    parameters. Each cell of the grid is simulated replicates times, all replicates and formulas being scored with
+    vectorized 2-D arrays, and cells are spread across worker processes.
+    :param formulas: Outlier detection formulas.
+    :param distribution_shapes: Shapes of the distribution. Defaults to Distribution.DISTRIBUTION_SHAPES.
+    :param outliers_shapes: Shapes of the outliers. Defaults to Distribution.OUTLIERS_SHAPES.
+    :param outliers_rates: Rates of outliers.
+    :param distribution_sizes: Numbers of valid data points. Samples of the reference datasets must be smaller than
+    their 1000 values to vary between replicates: larger sizes need generated.
+    :param replicates: Number of simulated distributions per cell.
+    :param seed: Seed of the simulations. Results do not depend on the number of workers.
+    :param workers: Number of worker processes. Defaults to the number of CPUs, 1 runs serially.
+    :param generated: Whether to draw from the parametric shapes, see distributions.generation, instead of sampling
+    the reference datasets.
+    :return: Dataframe with the parameters of each cell, the index of the formula in formulas, and the precision,
+    recall and F1 score of the formula, computed from the outliers flagged over all the replicates of the cell.
+    """
+    cells = list(itertools.product(distribution_shapes or Distribution.DISTRIBUTION_SHAPES,
+                                   outliers_shapes or Distribution.OUTLIERS_SHAPES, outliers_rates,
+                                   distribution_sizes))
+    seeds = np.random.SeedSequence(seed).spawn(len(cells))
+    arguments = [list(argument) for argument in zip(*cells)] + [[formulas] * len(cells), [replicates] * len(cells),
+                                                                seeds, [generated] * len(cells)]
+    workers = min(workers or os.cpu_count() or 1, len(cells))
+    if workers <= 1:
+        cells_counts = list(map(score_cell, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            cells_counts = list(executor.map(score_cell, *arguments, chunksize=max(len(cells) // (4 * workers), 1)))
+
+    results = pd.DataFrame([(*cell, formula) for cell in cells for formula in range(len(formulas))],
+                           columns=['distribution_shape', 'outliers_shape', 'outliers_rate', 'distribution_size',
+                                    'formula'])
+    true_positives, false_positives, false_negatives = np.concatenate(cells_counts).T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['precision'] = true_positives / (true_positives + false_positives)
+        results['recall'] = true_positives / (true_positives + false_negatives)
+        results['f1'] = 2 * true_positives / (2 * true_positives + false_positives + false_negatives)
+    return results
@@ -0,0 +1,90 @@
+import json
+import numpy as np
+from distributions.core import get_formula_threshold_from_stats
+from distributions.models import Formula, RobustStats
+from distributions.streaming import QuantileSketch, RunningMoments, get_sketch_stats
+
+
+class OnlineOutlierDetector:
+    """
+    Outlier detector for live data feeds. Each batch updates exact running moments and a bounded-memory quantile
+    sketch in O(batch), and detectors fed by different workers can be merged into one global detector.
+    """
+
+    def __init__(self, formula: Formula, k: int = 400, seed: int = None):
+        self.formula = formula
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(k=k, seed=seed)
+        self._stats = None
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    def update(self, batch: np.ndarray):
+        """
+        Add a batch of values to the detector. NaNs are ignored.
+        :param batch: Batch of values.
+        :return: None
+        """
+        batch = np.asarray(batch, dtype=float).ravel()
+        self.moments.update(batch)
+        self.sketch.update(batch)
+        self._stats = None
+
+    @property
+    def stats(self) -> RobustStats:
+        if self._stats is None:
+            self._stats = get_sketch_stats(self.moments, self.sketch)
+        return self._stats
+
+    def threshold(self) -> tuple[float, float]:
+        """
+        Calculate the outlier detection thresholds of all the values seen so far.
+        :return: thresh_down (float): Lower outlier detection threshold.
+        thresh_up (float): Upper outlier detection threshold.
+        """
+        return get_formula_threshold_from_stats(self.stats, self.formula)
+
+    def score(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Flag the outliers of a batch against the current thresholds, without adding the batch to the detector.
+        :param batch: Batch of values.
+        :return: Boolean array, True for the outliers. Always False before the first update.
+        """
+        batch = np.asarray(batch, dtype=float)
+        thresh_down, thresh_up = self.threshold()
+        return (batch < thresh_down) | (batch > thresh_up)
+
+    def merge(self, other: 'OnlineOutlierDetector'):
+        """
+        Combine the values seen by another detector into this detector.
+        :param other: Detector with the same formula.
+        :return: None
+        """
+        if other.formula != self.formula:
+            raise ValueError('Only detectors with the same formula can be merged')
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self._stats = None
+
+    def serialize(self) -> bytes:
+        """
+        Serialize the detector, for instance to send it to the process merging the detectors of every worker.
+        :return: JSON bytes of the formula, moments and sketch.
+        """
+        return json.dumps({'formula': self.formula.model_dump(), 'moments': self.moments.to_dict(),
+                           'sketch': self.sketch.to_dict()}).encode()
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> 'OnlineOutlierDetector':
+        """
+        Rebuild a detector serialized with serialize.
+        :param data: JSON bytes of the detector.
+        :return: Detector.
+        """
+        state = json.loads(data)
+        detector = cls(Formula(**state['formula']))
+        detector.moments = RunningMoments.from_dict(state['moments'])
+        detector.sketch = QuantileSketch.from_dict(state['sketch'])
+        return detector
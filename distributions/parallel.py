@@ -0,0 +1,66 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from distributions.models import Formula
+from distributions.core import get_formula_threshold
+
+# Under this number of values, starting the worker processes costs more than it saves
+MIN_PARALLEL_SIZE = 2_000_000
+
+_shared_values = None
+
+
+def _attach_values(path: str):
+    """
+    Map the shared values in a worker process, without copying them.
+    :param path: Path of the .npy file holding the values.
+    :return: None
+    """
+    global _shared_values
+    _shared_values = np.load(path, mmap_mode='r')
+
+
+def _get_shard_thresholds(start: int, stop: int, formula: Formula) -> list[tuple[float, float]]:
+    """
+    Calculate the thresholds of a range of columns of the shared values, in a worker process.
+    :param start: First column of the shard.
+    :param stop: Column after the last column of the shard.
+    :param formula: Outlier detection formula.
+    :return: Thresholds of each column of the shard.
+    """
+    return [get_formula_threshold(_shared_values[column], formula) for column in range(start, stop)]
+
+
+def get_thresholds_parallel(df: pd.DataFrame, formula: Formula, workers: int = None,
+                            min_size: int = MIN_PARALLEL_SIZE) -> np.ndarray:
+    """
+    Calculate the outlier detection thresholds of every numeric column of a dataframe, with the columns sharded
+    across worker processes. Workers read the values from a memory-mapped file instead of receiving pickled copies,
+    and compute each column with get_formula_threshold, so results are identical to the serial path.
+    :param df: Input dataframe. Non-numeric columns are ignored.
+    :param formula: Outlier detection formula.
+    :param workers: Number of worker processes. Defaults to the number of CPUs.
+    :param min_size: Number of values under which thresholds are computed serially.
+    :return: Array of shape (number of numeric columns, 2), last axis being (thresh_down, thresh_up). Columns are in the
+    order of df.select_dtypes('number').columns.
+    """
+    numeric_df = df.select_dtypes('number')
+    workers = min(workers or os.cpu_count() or 1, numeric_df.shape[1])
+    if workers <= 1 or numeric_df.size < min_size:
+        return np.array([get_formula_threshold(numeric_df[column].to_numpy(dtype=float), formula)
+                         for column in numeric_df.columns]).reshape(-1, 2)
+
+    bounds = np.linspace(0, numeric_df.shape[1], workers + 1).astype(int)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'values.npy')
+        # One contiguous row per column
+        shared_values = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=numeric_df.shape[::-1])
+        shared_values[:] = numeric_df.to_numpy(dtype=float).T
+        shared_values.flush()
+        del shared_values
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_values, initargs=(path,)) as executor:
+            shards = executor.map(_get_shard_thresholds, bounds[:-1], bounds[1:], [formula] * workers)
+            return np.array([threshold for shard in shards for threshold in shard]).reshape(-1, 2)
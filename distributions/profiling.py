@@ -0,0 +1,132 @@
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+import pandas as pd
+
+_active_profiler = ContextVar('active_profiler', default=None)
+# tracemalloc is process-wide: profilers tracing memory, in the script thread and in job threads, share it. Tracing is
+# stopped when the last of them exits, and every peak is folded into the open stages of all of them.
+_tracing_lock = threading.Lock()
+_tracing_profilers = []
+_started_tracing = False
+
+
+class Profiler:
+    """
+    Collect the wall time, and optionally the allocated memory, of the stages run while it is active.
+    Stages run outside of an active profiler cost a single context variable lookup. Memory is traced for the whole
+    process, so stages running at the same time in other threads add to each other's allocations.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._open_peaks = []
+        self._token = None
+
+    def __enter__(self) -> 'Profiler':
+        global _started_tracing
+        if self.trace_memory:
+            with _tracing_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _started_tracing = True
+                _tracing_profilers.append(self)
+        self._token = _active_profiler.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        global _started_tracing
+        _active_profiler.reset(self._token)
+        if self.trace_memory:
+            with _tracing_lock:
+                _tracing_profilers.remove(self)
+                if not _tracing_profilers and _started_tracing:
+                    tracemalloc.stop()
+                    _started_tracing = False
+
+    @staticmethod
+    def _update_open_peaks() -> int:
+        """
+        Fold the memory peak since the last reset into every open stage of every tracing profiler, then reset the
+        peak. Called with _tracing_lock held.
+        :return: Current traced memory.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        for profiler in _tracing_profilers:
+            profiler._open_peaks = [max(open_peak, peak) for open_peak in profiler._open_peaks]
+        tracemalloc.reset_peak()
+        return current
+
+    @contextmanager
+    def _stage(self, name: str):
+        tracing = self.trace_memory and self in _tracing_profilers
+        if tracing:
+            with _tracing_lock:
+                start_memory = self._update_open_peaks()
+                self._open_peaks.append(start_memory)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'stage': name, 'seconds': time.perf_counter() - start}
+            if tracing:
+                with _tracing_lock:
+                    end_memory = self._update_open_peaks()
+                    record['allocated_bytes'] = end_memory - start_memory
+                    record['peak_bytes'] = self._open_peaks.pop() - start_memory
+            self.records.append(record)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records, columns=['stage', 'seconds', 'allocated_bytes', 'peak_bytes'])
+
+    def export_jsonl(self, path: str, **labels):
+        """
+        Append the records to a JSON lines file, for instance to feed a metrics pipeline.
+        :param path: Path of the JSON lines file.
+        :param labels: Fields added to every record, for instance the page name.
+        :return: None
+        """
+        timestamp = time.time()
+        with open(path, 'a') as jsonl_file:
+            for record in self.records:
+                jsonl_file.write(json.dumps({'timestamp': timestamp, **labels, **record}) + '\n')
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a stage in the active profiler, if any.
+    :param name: Name of the stage.
+    :return: None
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+    else:
+        with profiler._stage(name):
+            yield
+
+
+def timed(name: str = None):
+    """
+    Decorate a function so that each call is a stage of the active profiler, if any.
+    :param name: Name of the stage. Defaults to the function name.
+    :return: Decorator.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler._stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,90 @@
+from typing import Callable
+import numpy as np
+import pandas as pd
+from distributions.core import ADJUSTED_MAD_SCALE
+from distributions.batch import STATS, get_formula_coefficients
+from distributions.models import Formula
+
+# Number of values held at once when computing the rolling MAD
+MAD_CHUNK_VALUES = 1 << 18
+
+
+def get_rolling_mad(values: np.ndarray, median: np.ndarray, window: int, progress: Callable = None) -> np.ndarray:
+    """
+    Calculate the raw Median Absolute Deviation of every trailing window of a series.
+    Windows are strided views of the series, processed by chunks to bound memory.
+    :param values: Input series.
+    :param median: Median of the trailing window ending at each row.
+    :param window: Number of rows of each window.
+    :param progress: Called with the fraction of windows done after each chunk. An exception it raises, like
+    JobCancelled, stops the calculation.
+    :return: Raw MAD of the window ending at each row, NaN for the first window - 1 rows.
+    """
+    progress = progress or (lambda *_: None)
+    mad = np.full(values.size, np.nan)
+    if values.size < window:
+        return mad
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)
+    chunk_size = max(MAD_CHUNK_VALUES // window, 1)
+    buffer = np.empty((min(chunk_size, len(windows)), window))
+    middle = window // 2
+    for start in range(0, len(windows), chunk_size):
+        stop = min(start + chunk_size, len(windows))
+        window_median = median[window - 1 + start:window - 1 + stop, np.newaxis]
+        deviations = buffer[:stop - start]
+        np.abs(np.subtract(windows[start:stop], window_median, out=deviations), out=deviations)
+        # A single selection: for even windows, the other middle deviation is the largest of the lower half
+        deviations.partition(middle, axis=1)
+        window_mad = deviations[:, middle]
+        if window % 2 == 0:
+            window_mad = (deviations[:, :middle].max(axis=1) + window_mad) / 2
+        mad[window - 1 + start:window - 1 + stop] = window_mad
+        progress(stop / len(windows))
+    return mad
+
+
+def get_rolling_threshold(data: np.ndarray, window: int, formula: Formula, progress: Callable = None) -> pd.DataFrame:
+    """
+    Calculate outlier detection thresholds over a trailing window of a time-ordered series.
+    Medians and quartiles are maintained by pandas' skip-list rolling quantiles in O(log window) per row, mean and SD
+    by running sums. Statistics that the formula does not use are not calculated. Rows whose window is incomplete,
+    at the start of the series or because of NaNs, get NaN thresholds and are not flagged.
+    :param data: Time-ordered input series.
+    :param window: Number of rows of each window.
+    :param formula: Outlier detection formula.
+    :param progress: Called with the fraction of the calculation done, after each statistic and each chunk of the
+    rolling MAD. An exception it raises, like JobCancelled, stops the calculation.
+    :return: Dataframe with columns 'thresh_down', 'thresh_up' and 'outlier', one row per input row.
+    """
+    if window < 2:
+        raise ValueError(f"window must be at least 2. Given {window = }")
+    progress = progress or (lambda *_: None)
+    values = np.asarray(data, dtype=float).ravel()
+    rolling = pd.Series(values).rolling(window)
+    stats = pd.DataFrame(0., index=range(values.size), columns=STATS)
+
+    if formula.mad_weight or formula.adjusted_mad_weight or formula.iqr_weight:
+        stats['median'] = rolling.median().to_numpy()
+        progress(0.1)
+    if formula.iqr_weight:
+        stats['q1'] = rolling.quantile(0.25).to_numpy()
+        stats['q3'] = rolling.quantile(0.75).to_numpy()
+        stats['iqr'] = stats['q3'] - stats['q1']
+        progress(0.2)
+    if formula.sd_weight:
+        stats['mean'] = rolling.mean().to_numpy()
+        stats['sd'] = rolling.std().to_numpy()
+        progress(0.25)
+    if formula.mad_weight or formula.adjusted_mad_weight:
+        # The selection over every window takes most of the time
+        raw_mad = get_rolling_mad(values, stats['median'].to_numpy(), window,
+                                  progress=lambda fraction: progress(0.25 + 0.75 * fraction))
+        stats['mad'] = raw_mad * 1.4826
+        stats['adjusted_mad'] = raw_mad * ADJUSTED_MAD_SCALE
+
+    thresholds = stats.to_numpy() @ get_formula_coefficients([formula])[:, 0, :]
+    # Windows with NaNs, or the first rows, have no median, mean or quartiles
+    incomplete = rolling.count().to_numpy() < window
+    thresholds[incomplete] = np.nan
+    return pd.DataFrame({'thresh_down': thresholds[:, 0], 'thresh_up': thresholds[:, 1],
+                         'outlier': (values < thresholds[:, 0]) | (values > thresholds[:, 1])})
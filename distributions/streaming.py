@@ -0,0 +1,226 @@
+import math
+import os
+from typing import Callable
+import numpy as np
+import pandas as pd
+from distributions.models import Formula, RobustStats
+from distributions.core import ADJUSTED_MAD_SCALE, get_formula_threshold_from_stats
+
+
+class RunningMoments:
+    """
+    Mean and variance of a stream of values, updated batch by batch with Welford's method (Chan et al. merge of
+    the batch moments into the running moments).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of values to the running moments. NaNs are ignored.
+        :param values: Batch of values.
+        :return: None
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            batch = RunningMoments()
+            batch.count = values.size
+            batch.mean = float(np.mean(values))
+            centered = values - batch.mean
+            batch.m2 = float(np.dot(centered, centered))
+            self.merge(batch)
+
+    def merge(self, other: 'RunningMoments'):
+        """
+        Combine the moments of another stream into these moments.
+        :param other: Running moments of the other stream.
+        :return: None
+        """
+        count = self.count + other.count
+        if count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def sd(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'RunningMoments':
+        moments = cls()
+        moments.count, moments.mean, moments.m2 = int(state['count']), float(state['mean']), float(state['m2'])
+        return moments
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL quantile sketch. Memory is bounded by about 3 * k values whatever the length of the stream, and the
+    normalized rank error of the quantiles is about 1.7 / k.
+    """
+
+    def __init__(self, k: int = 400, seed: int = None):
+        if k < 8:
+            raise ValueError(f"k must be at least 8. Given {k = }")
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(math.ceil(self.k * (2 / 3) ** depth), 8)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays at its level so that the total weight is preserved
+                leftover, items = items[items.size - items.size % 2:], items[:items.size - items.size % 2]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of values to the sketch. NaNs are ignored.
+        :param values: Batch of values.
+        :return: None
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        """
+        Combine the values summarized by another sketch into this sketch.
+        :param other: Sketch of the other stream.
+        :return: None
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def weighted_items(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the values retained by the sketch, sorted, with the number of stream values each of them represents.
+        :return: Sorted values and their weights.
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2. ** i) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile of the stream.
+        :param q: Quantile, between 0 and 1.
+        :return: Estimated quantile.
+        """
+        items, weights = self.weighted_items()
+        return _weighted_quantile(items, weights, q)
+
+    def to_dict(self) -> dict:
+        return {'k': self.k, 'count': self.count, 'levels': [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'QuantileSketch':
+        sketch = cls(k=int(state['k']))
+        sketch.count = int(state['count'])
+        sketch.levels = [np.asarray(level, dtype=float) for level in state['levels']]
+        return sketch
+
+
+def _weighted_quantile(items: np.ndarray, weights: np.ndarray, q: float) -> float:
+    """
+    Interpolate a quantile between sorted weighted items, each item being placed at the middle of its weight.
+    :param items: Sorted values.
+    :param weights: Weight of each value.
+    :param q: Quantile, between 0 and 1.
+    :return: Quantile of the weighted values.
+    """
+    if items.size == 0:
+        return np.nan
+    cumulative = np.cumsum(weights)
+    return float(np.interp(q * cumulative[-1], cumulative - weights / 2, items))
+
+
+def get_sketch_stats(moments: RunningMoments, sketch: QuantileSketch) -> RobustStats:
+    """
+    Estimate the statistics used by the outlier detection formulas from streaming summaries. Mean and SD are exact,
+    median, quartiles and MADs are estimated from the quantile sketch.
+    :param moments: Running moments of the stream.
+    :param sketch: Quantile sketch of the same stream.
+    :return: RobustStats of the stream.
+    """
+    if moments.count == 0:
+        return RobustStats()
+    items, weights = sketch.weighted_items()
+    median = _weighted_quantile(items, weights, 0.5)
+    deviations = np.abs(items - median)
+    order = np.argsort(deviations, kind='stable')
+    raw_mad = _weighted_quantile(deviations[order], weights[order], 0.5)
+    return RobustStats(count=moments.count, median=median, q1=_weighted_quantile(items, weights, 0.25),
+                       q3=_weighted_quantile(items, weights, 0.75), mean=moments.mean, sd=moments.sd,
+                       mad=raw_mad * 1.4826, adjusted_mad=raw_mad * ADJUSTED_MAD_SCALE)
+
+
+def get_streaming_threshold(file, column: str, formula: Formula, sep: str = ',', chunksize: int = 1_000_000,
+                            k: int = 400, seed: int = None, decimal: str = '.',
+                            progress: Callable = None) -> tuple[float, float]:
+    """
+    Calculate outlier detection thresholds of a CSV column without loading the whole file in memory. Only the chosen
+    column is parsed, chunk by chunk, with the C engine. Non-numeric values are ignored.
+    :param file: Path or file-like object of the CSV.
+    :param column: Name of the column where the values are.
+    :param formula: Outlier detection formula.
+    :param sep: Values separator.
+    :param chunksize: Number of rows parsed at once, which bounds memory usage.
+    :param k: Size parameter of the quantile sketch. Higher is more accurate.
+    :param seed: Seed of the quantile sketch compactions.
+    :param decimal: Decimal point of the values.
+    :param progress: Called with the fraction of the file read after each chunk, 0 if the file can not be seeked. An
+    exception it raises, like JobCancelled, stops the reading.
+    :return: thresh_down (float): Lower outlier detection threshold.
+    thresh_up (float): Upper outlier detection threshold.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        # Opened here so that the position in the file gives the progress
+        with open(file, 'rb') as csv_file:
+            return get_streaming_threshold(csv_file, column, formula, sep=sep, chunksize=chunksize, k=k, seed=seed,
+                                           decimal=decimal, progress=progress)
+    progress = progress or (lambda *_: None)
+    start, size = 0, 0
+    if file.seekable():
+        start = file.tell()
+        size = file.seek(0, os.SEEK_END) - start
+        file.seek(start)
+
+    moments = RunningMoments()
+    sketch = QuantileSketch(k=k, seed=seed)
+    for chunk in pd.read_csv(file, sep=sep, decimal=decimal, usecols=[column], chunksize=chunksize,
+                             engine='c'):
+        values = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=float)
+        moments.update(values)
+        sketch.update(values)
+        progress(min((file.tell() - start) / size, 1.) if size else 0.)
+    return get_formula_threshold_from_stats(get_sketch_stats(moments, sketch), formula)
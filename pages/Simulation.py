@@ -1,8 +1,18 @@
-from distributions.models import Distribution, Formula
-from distributions.distributions import get_full_distribution, distribution_graph, formula_choice, get_plot_kind
+from distributions.models import Analysis, Distribution, Formula
+from distributions.distributions import get_full_distribution, distribution_graph, formula_choice, get_plot_kind, \
+    get_confidence_interval_choice, get_profiler, profiling_panel, show_job, submit_job
+from distributions.datasets import get_distribution_values, get_outliers_values
+from distributions.generation import generate_full_distribution
+from distributions.jobs import get_analysis, make_job_key
+from distributions.profiling import Profiler, timed
+from contextlib import nullcontext
+from functools import partial
+from typing import Callable
 import streamlit as st
 import pandas as pd
-import os
+
+# Largest distribution that can be generated from the parametric shapes
+MAX_GENERATED_SIZE = 10_000_000
 
 
 def get_user_distribution(container_1: st.container, container_2: st.container) -> Distribution:
@@ -14,8 +24,16 @@ def get_user_distribution(container_1: st.container, container_2: st.container)
         user_distribution.distribution_shape = st.radio("Shape : ",
                                                         [distribution_shape.title() for distribution_shape in
                                                          Distribution.DISTRIBUTION_SHAPES])
-        user_distribution.distribution_size = st.slider(label="Distribution size", min_value=10, max_value=1000,
-                                                        value=100)
+        user_distribution.generated = st.toggle('Generate values', help='Draw the values from the parametric shapes '
+                                                                        'instead of the reference samples, which '
+                                                                        'allows larger distributions')
+        if user_distribution.generated:
+            user_distribution.distribution_size = st.number_input(label="Distribution size", min_value=10,
+                                                                  max_value=MAX_GENERATED_SIZE, value=100_000,
+                                                                  step=10_000)
+        else:
+            user_distribution.distribution_size = st.slider(label="Distribution size", min_value=10, max_value=1000,
+                                                            value=100)
     # User outliers parameters selection
     with container_2:
         st.subheader("Outlier distribution parameters")
@@ -43,34 +61,47 @@ def get_outliers_shape() -> str:
         raise ValueError('Incorrect outliers shape')
 
 
+@timed()
 def simulate_distribution(user_distribution: Distribution) -> pd.DataFrame:
-    # Get path of sample data csv and import them
-    file_path_distributions = os.path.join("data", "distributions.csv")
-    file_path_outliers = os.path.join("data", "outliers.csv")
-
-    distributions_df = pd.read_csv(file_path_distributions, sep=";", decimal=".")
-    outliers_df = pd.read_csv(file_path_outliers, sep=";", decimal=",")
+    if user_distribution.generated:
+        return generate_full_distribution(user_distribution.distribution_shape.lower(),
+                                          user_distribution.distribution_size, user_distribution.outliers_shape,
+                                          user_distribution.outliers_rate)
+    # Get sample data, loaded once per process
+    distribution_values = get_distribution_values(user_distribution.distribution_shape.lower())
+    outliers_values = get_outliers_values(user_distribution.outliers_shape.lower().replace(" ", "_"))
 
     # Import distribution from users chosen parameters
-    distribution = get_full_distribution(distributions_df[user_distribution.distribution_shape.lower()],
-                                         user_distribution.distribution_size,
-                                         outliers_df[
-                                             user_distribution.outliers_shape.lower().replace(" ", "_")],
+    distribution = get_full_distribution(distribution_values, user_distribution.distribution_size, outliers_values,
                                          user_distribution.outliers_rate)
     return distribution
 
 
-def run_simulation(distribution: Distribution, formula: Formula, kind: str):
-    # Import Data from sample csv
-    distribution.data = simulate_distribution(distribution)
-    # Make a plot of the data
-    distribution_graph(distribution=distribution.data, formula=formula, kind=kind)
+def get_simulation(distribution: Distribution, formula: Formula, confidence_interval: bool = False,
+                   progress: Callable = None) -> tuple[pd.DataFrame, Analysis]:
+    # Simulate the distribution and calculate its thresholds, run as a job
+    progress = progress or (lambda *_: None)
+    progress(0, 'Simulating the distribution')
+    data = simulate_distribution(distribution)
+    return data, get_analysis(data['Distribution'].to_numpy(), formula, confidence_interval, progress)
+
+
+def run_simulation(distribution: Distribution, formula: Formula, kind: str, confidence_interval: bool = False,
+                   profiler: Profiler = None, result: tuple[pd.DataFrame, Analysis] = None):
+    with profiler or nullcontext():
+        # Import Data from sample csv, unless a job already did
+        distribution.data, analysis = result if result is not None else (simulate_distribution(distribution), None)
+        # Make a plot of the data
+        distribution_graph(distribution=distribution.data, formula=formula, kind=kind,
+                           confidence_interval=confidence_interval, analysis=analysis)
+    profiling_panel(profiler, page='Simulation')
 
 
 def main():
     # Layout
     st.set_page_config(layout='wide',
                        page_title='Simulation - Outlier Detection')
+    result_container = st.container()
     col_1, col_2, = st.columns(2, gap='medium')
 
     # Allow user to choose distribution and outliers parameters
@@ -79,10 +110,17 @@ def main():
     # Allow user to select formula and figure kind in sidebar
     user_formula = formula_choice()
     plot_kind = get_plot_kind()
-
-    # Create button to view the figure
-    st.button('View', on_click=run_simulation,
-              kwargs={'distribution': user_distribution, 'formula': user_formula, 'kind': plot_kind})
+    confidence_interval = get_confidence_interval_choice()
+    profiler = get_profiler()
+
+    # Create button to view the figure, computed in the background
+    job_key = make_job_key('simulation', user_distribution, user_formula, confidence_interval)
+    st.button('View', on_click=submit_job,
+              kwargs={'key': job_key, 'func': get_simulation, 'profiler': profiler, 'distribution': user_distribution,
+                      'formula': user_formula, 'confidence_interval': confidence_interval})
+    with result_container:
+        show_job(job_key, partial(run_simulation, user_distribution, user_formula, plot_kind, confidence_interval,
+                                  profiler), profiler)
 
 
 if __name__ == '__main__':
@@ -1,47 +1,180 @@
+import io
+from contextlib import nullcontext
+from functools import partial
+from typing import Callable
+import numpy as np
 import streamlit as st
 import pandas as pd
-from distributions.distributions import distribution_graph, formula_choice, get_plot_kind
-from distributions.models import Formula
+import pyarrow as pa
+from distributions.distributions import distribution_graph, formula_choice, get_plot_kind, \
+    rolling_threshold_graph, get_confidence_interval_choice, get_profiler, profiling_panel, read_uploaded_table, \
+    grouped_threshold_graph, get_sorted_column, threshold_preview, get_upload_fingerprint, show_job, submit_job
+from distributions.grouped import get_grouped_thresholds
+from distributions.ingestion import CSV_EXTENSIONS, SNIFF_BYTES, UPLOAD_TYPES, get_column_keys, get_column_values, \
+    get_numeric_columns, sniff_csv_dialect
+from distributions.jobs import get_analysis, make_job_key
+from distributions.models import Analysis, Formula
+from distributions.profiling import Profiler, stage, timed
+from distributions.rolling import get_rolling_threshold
+from distributions.streaming import get_streaming_threshold
 
+# Largest rolling window. The rolling MAD selects the median of every window, in O(rows * window)
+MAX_ROLLING_WINDOW = 1000
+# Number of rows of a large CSV read to find its numeric columns
+SAMPLE_ROWS = 1000
 
-def get_distribution_from_df(user_df: pd.DataFrame, values_col_name: str) -> pd.DataFrame:
-    distribution = pd.DataFrame()
-    distribution["Distribution"] = pd.Series(user_df[values_col_name])
+
+@timed()
+def get_distribution_from_values(values: np.ndarray) -> pd.DataFrame:
+    distribution = pd.DataFrame({"Distribution": pd.Series(values, copy=False)}, copy=False)
     distribution["Type"] = "Data points"
     return distribution
 
 
-def run_visualization(df: pd.DataFrame, col_name: str, formula: Formula, kind: str):
-    user_full_distribution = get_distribution_from_df(df, col_name)
-    distribution_graph(distribution=user_full_distribution, formula=formula, kind=kind)
+def get_visualization(values: np.ndarray, formula: Formula, window: int = 0, confidence_interval: bool = False,
+                      groups: np.ndarray = None, progress: Callable = None) -> pd.DataFrame | Analysis:
+    # Calculate the thresholds shown by run_visualization, run as a job
+    progress = progress or (lambda *_: None)
+    if groups is not None:
+        progress(0, 'Calculating the thresholds of every group')
+        with stage('grouped_threshold'):
+            return get_grouped_thresholds(values, groups, formula, progress=progress)
+    if window > 1:
+        progress(0, 'Calculating the rolling thresholds')
+        with stage('rolling_threshold'):
+            return get_rolling_threshold(values, window, formula, progress=progress)
+    return get_analysis(values, formula, confidence_interval, progress)
+
+
+def run_visualization(values: np.ndarray, formula: Formula, kind: str, window: int = 0,
+                      confidence_interval: bool = False, groups: np.ndarray = None, profiler: Profiler = None,
+                      result: pd.DataFrame | Analysis = None):
+    with profiler or nullcontext():
+        if groups is not None:
+            grouped_threshold_graph(values=values, groups=groups, formula=formula, thresholds=result)
+        elif window > 1:
+            with stage('rolling_threshold_graph'):
+                rolling_threshold_graph(values=values, formula=formula, window=window, bands=result)
+        else:
+            user_full_distribution = get_distribution_from_values(values)
+            distribution_graph(distribution=user_full_distribution, formula=formula, kind=kind,
+                               confidence_interval=confidence_interval, analysis=result)
+    profiling_panel(profiler, page='Visualization')
+
+
+def get_streaming(file, sep: str, decimal: str, col_name: str, formula: Formula,
+                  progress: Callable = None) -> tuple[float, float]:
+    # Read the file chunk by chunk, run as a job
+    progress = progress or (lambda *_: None)
+    progress(0, 'Reading the file')
+    with stage('streaming_threshold'):
+        return get_streaming_threshold(file, col_name, formula, sep=sep, decimal=decimal, progress=progress)
+
+
+def run_streaming_threshold(result: tuple[float, float], profiler: Profiler = None):
+    thresh_down, thresh_up = result
+    profiling_panel(profiler, page='Visualization')
+    with st.container(border=True):
+        col_1, col_2 = st.columns(2)
+        col_1.metric('Lower threshold', f'{thresh_down:.4g}')
+        col_2.metric('Upper threshold', f'{thresh_up:.4g}')
 
 
 def main():
     #Layout
     st.set_page_config(page_title='Visualization - Outlier Detection')
+    result_container = st.container()
 
-    user_file = st.file_uploader("Import CSV", type='csv')
+    user_file = st.file_uploader("Import a table", type=UPLOAD_TYPES,
+                                 help='CSV, Parquet, Feather or Arrow IPC file. The values separator of a CSV is '
+                                      'detected automatically.')
     user_formula = formula_choice()
     plot_kind = get_plot_kind()
+    confidence_interval = get_confidence_interval_choice()
+    profiler = get_profiler()
 
+    job_key, render = None, None
     if user_file is not None:
-        separator = st.selectbox('Values separator', options=[',', ';', r'\t'])
+        is_csv = user_file.name.lower().endswith(CSV_EXTENSIONS)
+        streaming = is_csv and st.checkbox('Large file', help='Parse only the chosen column, chunk by chunk, and '
+                                                              'estimate the threshold with a quantile sketch, which '
+                                                              'keeps the parsed values out of memory. The uploaded '
+                                                              'file itself is held in memory: for files larger than '
+                                                              'memory, use `python -m distributions --stream`. No '
+                                                              'figure is shown.')
 
         try:
-            user_df = pd.read_csv(user_file, sep=separator, engine='python')
-            values_col_names = st.radio("Click on the column where the values are",
-                                        [column for column in user_df.columns])
-
-            st.button('View', on_click=run_visualization, kwargs={'df': user_df,
-                                                                 'col_name': values_col_names,
-                                                                 'formula': user_formula,
-                                                                  'kind': plot_kind
-                                                                 })
-        except pd.errors.ParserError:
-            st.error('Please select the right values separator')
+            if streaming:
+                user_file.seek(0)
+                separator, decimal = sniff_csv_dialect(user_file.read(SNIFF_BYTES))
+                user_file.seek(0)
+                sample = pd.read_csv(user_file, sep=separator, decimal=decimal, nrows=SAMPLE_ROWS)
+                numeric_columns = list(sample.select_dtypes('number').columns)
+                if not numeric_columns:
+                    st.error('The file has no numeric column')
+                    return
+                values_col_names = st.radio("Click on the column where the values are", numeric_columns)
+
+                # The job reads its own file object, the script thread seeking the uploaded one on every rerun
+                job_key = make_job_key('streaming', get_upload_fingerprint(user_file.file_id, user_file),
+                                       values_col_names, user_formula)
+                st.button('View', on_click=submit_job, kwargs={'key': job_key,
+                                                              'func': get_streaming,
+                                                              'profiler': profiler,
+                                                              'file': io.BytesIO(user_file.getvalue()),
+                                                              'sep': separator,
+                                                              'decimal': decimal,
+                                                              'col_name': values_col_names,
+                                                              'formula': user_formula
+                                                              })
+                render = partial(run_streaming_threshold, profiler=profiler)
+            else:
+                with profiler or nullcontext(), stage('read_table'):
+                    user_table = read_uploaded_table(user_file.file_id, user_file)
+                numeric_columns = get_numeric_columns(user_table)
+                if not numeric_columns:
+                    st.error('The file has no numeric column')
+                    return
+                values_col_names = st.radio("Click on the column where the values are", numeric_columns)
+                group_col_name = st.selectbox('Group by', [None] + [column for column in user_table.column_names
+                                                                    if column != values_col_names],
+                                              format_func=lambda column: 'None' if column is None else column,
+                                              help='Calculate one threshold per group, for instance per device or '
+                                                   'per site')
+                window = st.number_input('Rolling window', min_value=0, max_value=MAX_ROLLING_WINDOW, value=0,
+                                         step=1, disabled=group_col_name is not None,
+                                         help='For time-ordered values, number of rows over which the threshold is '
+                                              f'calculated, up to {MAX_ROLLING_WINDOW}. 0 or 1 uses the whole '
+                                              'column.')
+
+                values = get_column_values(user_table, values_col_names)
+                if st.toggle('Live preview', value=True, help='Show the thresholds of the formula as it is changed. '
+                                                              'The column is sorted once when it is chosen.'):
+                    threshold_preview(get_sorted_column(user_file.file_id, values_col_names, values), user_formula)
+
+                groups = None if group_col_name is None else get_column_keys(user_table, group_col_name)
+                job_key = make_job_key('visualization', get_upload_fingerprint(user_file.file_id, user_file),
+                                       values_col_names, group_col_name, window, user_formula, confidence_interval)
+                st.button('View', on_click=submit_job, kwargs={'key': job_key,
+                                                              'func': get_visualization,
+                                                              'profiler': profiler,
+                                                              'values': values,
+                                                              'formula': user_formula,
+                                                              'window': window,
+                                                              'confidence_interval': confidence_interval,
+                                                              'groups': groups
+                                                              })
+                render = partial(run_visualization, values, user_formula, plot_kind, window, confidence_interval,
+                                 groups, profiler)
+        except (pa.ArrowInvalid, pd.errors.ParserError):
+            st.error('The file could not be read. Please check its format')
         except:
             st.error('Something went wrong')
 
+    # Outside of the try block, which would catch the reruns of the progress fragment
+    with result_container:
+        show_job(job_key, render, profiler)
+
 
 if __name__ == '__main__':
     main()
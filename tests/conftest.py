@@ -0,0 +1,89 @@
+import json
+import os
+import time
+import tracemalloc
+import pytest
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+MIN_BENCHMARK_SECONDS = 0.2
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption('--benchmark', action='store_true', help='Run the performance benchmarks')
+    group.addoption('--benchmark-save', action='store_true',
+                    help=f'Save the benchmark results as the new baseline in {BASELINE_PATH}')
+    group.addoption('--benchmark-tolerance', type=float, default=0.3,
+                    help='Relative slowdown or memory increase over the baseline above which a benchmark fails')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: performance benchmark, only run with --benchmark')
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption('--benchmark'):
+        skip = pytest.mark.skip(reason='performance benchmark, run with --benchmark')
+        for item in items:
+            if 'benchmark' in item.keywords:
+                item.add_marker(skip)
+
+
+class BenchmarkRecorder:
+    """
+    Measure the wall time and peak memory of a function, and compare them with the saved baseline.
+    """
+
+    def __init__(self, baseline: dict, tolerance: float):
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.results = {}
+
+    def measure(self, name: str, points: int, func, *args, **kwargs):
+        """
+        Run a function at least 3 times, and for at least MIN_BENCHMARK_SECONDS, keeping its best wall time, then once
+        more under tracemalloc for its peak memory.
+        :param name: Name of the benchmark in the baseline.
+        :param points: Number of data points processed, to report the throughput.
+        :param func: Benchmarked function.
+        :return: Result of the function.
+        """
+        seconds, runs, total = float('inf'), 0, 0.
+        while runs < 3 or (total < MIN_BENCHMARK_SECONDS and runs < 1000):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            seconds, runs, total = min(seconds, elapsed), runs + 1, total + elapsed
+        tracemalloc.start()
+        func(*args, **kwargs)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.results[name] = {'seconds': seconds, 'points_per_second': points / seconds, 'peak_bytes': peak_bytes}
+        baseline = self.baseline.get(name)
+        if baseline is not None:
+            for metric in ('seconds', 'peak_bytes'):
+                if self.results[name][metric] > baseline[metric] * (1 + self.tolerance):
+                    pytest.fail(f'{name} regressed: {metric} went from {baseline[metric]:.4g} to '
+                                f'{self.results[name][metric]:.4g}')
+        return result
+
+
+@pytest.fixture(scope='session')
+def benchmark_recorder(request):
+    baseline = {}
+    if os.path.exists(BASELINE_PATH) and not request.config.getoption('--benchmark-save'):
+        with open(BASELINE_PATH) as baseline_file:
+            baseline = json.load(baseline_file)
+    recorder = BenchmarkRecorder(baseline, request.config.getoption('--benchmark-tolerance'))
+    yield recorder
+    if request.config.getoption('--benchmark-save') and recorder.results:
+        with open(BASELINE_PATH, 'w') as baseline_file:
+            json.dump(recorder.results, baseline_file, indent=2, sort_keys=True)
+
+
+@pytest.fixture
+def benchmark(benchmark_recorder, request):
+    def measure(points: int, func, *args, **kwargs):
+        return benchmark_recorder.measure(request.node.name, points, func, *args, **kwargs)
+    return measure
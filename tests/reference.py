@@ -0,0 +1,80 @@
+"""
+Reference implementations of the statistics, as first written, used as correctness oracle of the optimized paths.
+They are NaN-aware like the original code except get_mad, so compare them on data without NaNs.
+"""
+import math
+import numpy as np
+from scipy.stats import norm
+
+
+def get_mad(data: np.ndarray) -> float:
+    median_value = np.median(data)
+    absolute_deviations = np.abs(data - median_value)
+    mad_value = np.median(absolute_deviations)
+    scale_factor = 1 / norm.ppf(3/4)  # Quantile function at 75th percentile
+    scaled_mad = mad_value * scale_factor
+
+    return scaled_mad
+
+
+def calculate_mad(data: np.ndarray) -> float:
+    median = np.nanmedian(data)
+    deviations = np.abs(data - median)
+    mad = np.nanmedian(deviations)
+    return mad * 1.4826
+
+
+def calculate_iqr(data: np.ndarray) -> float:
+    q1 = np.nanpercentile(data, 25)
+    q3 = np.nanpercentile(data, 75)
+    iqr = q3 - q1
+    return iqr
+
+
+def calculate_sd(data: np.ndarray) -> float:
+    mean_value = np.nanmean(data)
+    squared_diff = [(x - mean_value) ** 2 for x in data]
+    div = len(data) - 1
+    variance = np.nansum(squared_diff) / div
+    sd = math.sqrt(variance)
+    return sd
+
+
+def get_threshold(data: np.ndarray, weight_mad: float, weight_iqr: float, weight_sd: float, weight_adjusted_mad: float,
+                  const_mad: float,
+                  const_iqr: float, const_sd: float, const_adjusted_mad: float) -> float:
+    mad = calculate_mad(data)
+    iqr = calculate_iqr(data)
+    sd = calculate_sd(data)
+    adjusted_mad = get_mad(data)
+    thresh_up = weight_adjusted_mad * (np.nanmedian(data) + const_adjusted_mad * adjusted_mad) + weight_mad * (
+                np.nanmedian(data) + const_mad * mad) + weight_iqr * (
+                        np.nanpercentile(data, 75) + const_iqr * iqr) + weight_sd * (np.nanmean(data) + const_sd * sd)
+    thresh_down = weight_adjusted_mad * (np.nanmedian(data) - const_adjusted_mad * adjusted_mad) + weight_mad * (
+                np.nanmedian(data) - const_mad * mad) + weight_iqr * (
+                          np.nanpercentile(data, 25) - const_iqr * iqr) + weight_sd * (np.nanmean(data) - const_sd * sd)
+    return thresh_down, thresh_up
+
+
+def get_formula_threshold(data: np.ndarray, formula) -> tuple[float, float]:
+    return get_threshold(data, weight_mad=formula.mad_weight, weight_iqr=formula.iqr_weight,
+                         weight_sd=formula.sd_weight, weight_adjusted_mad=formula.adjusted_mad_weight,
+                         const_mad=formula.mad_constant, const_iqr=formula.iqr_constant,
+                         const_sd=formula.sd_constant, const_adjusted_mad=formula.adjusted_mad_constant)
+
+
+def make_data(kind: str, size: int, seed: int = 0) -> np.ndarray:
+    """
+    Generate benchmark inputs.
+    :param kind: 'normal', 'skewed' (lognormal) or 'nan' (normal with 30% NaNs).
+    :param size: Number of values.
+    :param seed: Seed of the generator.
+    :return: Generated values.
+    """
+    rng = np.random.default_rng(seed)
+    if kind == 'skewed':
+        return rng.lognormal(sigma=1.5, size=size)
+    data = rng.normal(size=size)
+    if kind == 'nan':
+        data[rng.random(size) < 0.3] = np.nan
+    return data
@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+from distributions.batch import get_thresholds_batch
+from distributions.core import get_formula_threshold
+from distributions.models import Formula
+
+def test_thresholds_batch():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.normal(size=500), 'b': rng.gamma(2, size=500), 'label': 'x'})
+    df.loc[::7, 'b'] = np.nan
+    formulas = [Formula(mad_weight=1, mad_constant=2.5), Formula(iqr_weight=1, iqr_constant=1.5),
+                Formula(sd_weight=0.5, sd_constant=3, adjusted_mad_weight=0.5, adjusted_mad_constant=2)]
+    thresholds = get_thresholds_batch(df, formulas)
+    assert thresholds.shape == (2, 3, 2)
+    for i, column in enumerate(['a', 'b']):
+        for j, formula in enumerate(formulas):
+            assert np.allclose(thresholds[i, j], get_formula_threshold(df[column].to_numpy(), formula))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+import reference
+from distributions.cli import read_table
+from distributions.core import calculate_sd, get_formula_threshold, get_full_distribution
+from distributions.models import Formula
+from distributions.streaming import get_streaming_threshold
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** 3, 10 ** 5, 10 ** 7]
+KINDS = ['normal', 'skewed', 'nan']
+FORMULA = Formula(mad_weight=0.25, iqr_weight=0.25, sd_weight=0.25, adjusted_mad_weight=0.25, mad_constant=2.5,
+                  iqr_constant=1.5, sd_constant=3, adjusted_mad_constant=2.5)
+# The reference implementations loop in Python, they are only run as oracle up to this size
+MAX_ORACLE_SIZE = 10 ** 5
+
+
+@pytest.fixture(scope='session')
+def csv_path(tmp_path_factory):
+    paths = {}
+
+    def get_path(size: int):
+        if size not in paths:
+            paths[size] = tmp_path_factory.mktemp('benchmark') / f'{size}.csv'
+            pd.DataFrame({'id': np.arange(size), 'values': reference.make_data('nan', size)}).to_csv(paths[size],
+                                                                                                   index=False)
+        return paths[size]
+    return get_path
+
+
+@pytest.mark.parametrize('kind', KINDS)
+@pytest.mark.parametrize('size', SIZES)
+def test_get_threshold(benchmark, kind, size):
+    data = reference.make_data(kind, size)
+    threshold = benchmark(size, get_formula_threshold, data, FORMULA)
+    if size <= MAX_ORACLE_SIZE:
+        assert threshold == reference.get_formula_threshold(data[~np.isnan(data)], FORMULA)
+
+
+@pytest.mark.parametrize('kind', ['normal', 'skewed'])
+@pytest.mark.parametrize('size', SIZES)
+def test_calculate_sd(benchmark, kind, size):
+    data = reference.make_data(kind, size)
+    sd = benchmark(size, calculate_sd, data)
+    if size <= MAX_ORACLE_SIZE:
+        assert sd == reference.calculate_sd(data)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_get_full_distribution(benchmark, size):
+    pool, outliers = reference.make_data('normal', 2 * size), reference.make_data('skewed', size, seed=1) + 5
+    distribution = benchmark(size, get_full_distribution, pool, size, outliers, 0.2, seed=0)
+    assert len(distribution) == size + round(0.2 * size / 0.8)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_read_csv(benchmark, csv_path, size):
+    df = benchmark(size, read_table, str(csv_path(size)), columns=['values'])
+    assert len(df) == size
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_streaming_threshold(benchmark, csv_path, size):
+    thresh_down, thresh_up = benchmark(size, get_streaming_threshold, csv_path(size), 'values', FORMULA, seed=0)
+    assert thresh_down < thresh_up
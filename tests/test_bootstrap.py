@@ -0,0 +1,25 @@
+import pytest
+import numpy as np
+from distributions.bootstrap import get_bootstrap_threshold
+from distributions.core import get_formula_threshold
+from distributions.models import Formula
+
+def test_bootstrap_interval_contains_threshold():
+    data = np.random.default_rng(0).normal(size=200)
+    formula = Formula(mad_weight=1, mad_constant=2.5)
+    intervals = get_bootstrap_threshold(data, formula, n_resamples=500, seed=0)
+    for (lower, upper), threshold in zip(intervals, get_formula_threshold(data, formula)):
+        assert lower < threshold < upper
+    assert intervals == get_bootstrap_threshold(data, formula, n_resamples=500, seed=0, workers=2)
+
+def test_bootstrap_progress_stops_resampling():
+    data = np.random.default_rng(0).normal(size=100_000)
+    fractions = []
+
+    def stop(fraction):
+        fractions.append(fraction)
+        raise InterruptedError
+
+    with pytest.raises(InterruptedError):
+        get_bootstrap_threshold(data, Formula(mad_weight=1, mad_constant=2.5), seed=0, workers=2, progress=stop)
+    assert fractions == [20 / 1000]
@@ -0,0 +1,16 @@
+import numpy as np
+from distributions.cache import ThresholdCache
+from distributions.models import Formula
+
+def test_threshold_cache():
+    cache = ThresholdCache(maxsize=2)
+    data = np.arange(10.)
+    key = cache.make_key(data, Formula(sd_weight=1))
+    assert cache.get(key) is None
+    cache.set(key, (0., 1.))
+    assert cache.get(cache.make_key(data.copy(), Formula(sd_weight=1))) == (0., 1.)
+    assert cache.get(cache.make_key(data, Formula(sd_weight=0.5))) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.set(cache.make_key(data + 1, Formula()), (1., 2.))
+    cache.set(cache.make_key(data + 2, Formula()), (2., 3.))
+    assert len(cache) == 2 and cache.get(key) is None
@@ -0,0 +1,29 @@
+import pandas as pd
+from distributions.cli import main
+
+def test_cli_thresholds_and_flags(tmp_path):
+    output, flags = tmp_path / "thresholds.csv", tmp_path / "flags.csv"
+    assert main(["data/distributions.csv", "--sep", ";", "-c", "normal", "-c", "flat", "--method", "1.5 IQR",
+                 "-o", str(output), "--flags", str(flags)]) == 0
+    thresholds = pd.read_csv(output)
+    assert list(thresholds["column"]) == ["normal", "flat"]
+    assert list(pd.read_csv(flags).sum()) == list(thresholds["outliers"])
+
+def test_cli_stream(tmp_path):
+    output, exact = tmp_path / "thresholds.csv", tmp_path / "exact.csv"
+    assert main(["data/distributions.csv", "--sep", ";", "-c", "normal", "--stream", "--chunksize", "100",
+                 "-o", str(output)]) == 0
+    assert main(["data/distributions.csv", "--sep", ";", "-c", "normal", "-o", str(exact)]) == 0
+    streamed, loaded = pd.read_csv(output), pd.read_csv(exact)
+    assert list(streamed["column"]) == ["normal"]
+    assert abs(streamed["thresh_up"][0] - loaded["thresh_up"][0]) < 0.05
+    assert abs(streamed["outliers"][0] - loaded["outliers"][0]) <= 5
+
+def test_cli_detects_dialect(tmp_path):
+    path, output = tmp_path / "values.csv", tmp_path / "thresholds.csv"
+    values = pd.read_csv("data/distributions.csv", sep=";")["normal"]
+    pd.DataFrame({"id": range(len(values)), "values": values}).to_csv(path, sep=";", decimal=",", index=False)
+    assert main([str(path), "-c", "values", "-o", str(output)]) == 0
+    assert main(["data/distributions.csv", "--sep", ";", "-c", "normal", "-o", str(tmp_path / "exact.csv")]) == 0
+    assert pd.read_csv(output)[["thresh_down", "thresh_up"]].equals(
+        pd.read_csv(tmp_path / "exact.csv")[["thresh_down", "thresh_up"]])
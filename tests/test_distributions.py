@@ -1,5 +1,9 @@
 import pandas as pd
 import numpy as np
+from distributions.core import calculate_iqr, calculate_mad, calculate_sd, get_confusion_matrix, get_full_distribution, \
+    get_mad, get_robust_stats, score_outliers
+from distributions.datasets import _read_sidecar, _write_sidecar, get_distribution_values, get_outliers_values, \
+    load_reference_dataset
 
 def test_df_col_names():
     distributions_df = pd.read_csv("data/distributions.csv", sep=";")
@@ -8,4 +12,52 @@ def test_df_col_names():
 def test_mean():
     series = pd.Series([1, 2, 3])
     mean = np.mean(series)
-    assert mean == 2
\ No newline at end of file
+    assert mean == 2
+
+def test_robust_stats():
+    data = np.random.default_rng(0).normal(size=1001)
+    stats = get_robust_stats(np.append(data, np.nan))
+    assert stats.count == 1001
+    assert stats.mad == calculate_mad(data)
+    assert stats.adjusted_mad == get_mad(data)
+    assert stats.iqr == calculate_iqr(data)
+    assert stats.sd == calculate_sd(data)
+    assert stats.median == np.median(data)
+
+def test_reference_datasets():
+    distributions_df = pd.read_csv("data/distributions.csv", sep=";")
+    outliers_df = pd.read_csv("data/outliers.csv", sep=";", decimal=",")
+    for _ in range(2):
+        load_reference_dataset.cache_clear()
+        assert np.array_equal(get_distribution_values("normal"), distributions_df["normal"])
+        assert np.array_equal(get_outliers_values("outlier_2_side_centered_close"),
+                              outliers_df["outlier_2_side_centered_close"])
+
+def test_sidecar_rewrite_keeps_mapped_values(tmp_path):
+    csv_path, npy_path, meta_path = "data/distributions.csv", str(tmp_path / "d.npy"), str(tmp_path / "d.json")
+    df = pd.read_csv(csv_path, sep=";")
+    _write_sidecar(csv_path, npy_path, meta_path, df)
+    mapped = _read_sidecar(csv_path, npy_path, meta_path)
+    # The sidecar is replaced, not truncated, so the memory map still reads the previous file
+    _write_sidecar(csv_path, npy_path, meta_path, df * 2)
+    assert np.array_equal(mapped["normal"], df["normal"])
+    assert np.array_equal(_read_sidecar(csv_path, npy_path, meta_path)["normal"], df["normal"] * 2)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["d.json", "d.npy"]
+
+def test_full_distribution_is_reproducible():
+    distribution = get_full_distribution(get_distribution_values("normal"), 100,
+                                         get_outliers_values("outlier_1_side_centered_extreme"), 0.2, seed=1)
+    assert len(distribution) == 125
+    assert (distribution["Type"] == "Outliers").sum() == 25
+    assert distribution.equals(get_full_distribution(get_distribution_values("normal"), 100,
+                                                     get_outliers_values("outlier_1_side_centered_extreme"), 0.2,
+                                                     seed=1))
+
+def test_score_outliers():
+    score = score_outliers(np.array([0., 5., -5., np.nan, 1., 6.]), -1, 2)
+    assert (score.count_down, score.count_up) == (1, 2)
+    assert score.indices.tolist() == [1, 2, 5]
+    assert score.mask.tolist() == [False, True, True, False, False, True]
+    confusion_matrix = get_confusion_matrix(score, ["Valid data points"] * 4 + ["Outliers"] * 2)
+    assert confusion_matrix.loc["Outliers"].tolist() == [1, 1]
+    assert confusion_matrix.loc["Valid data points"].tolist() == [2, 2]
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from distributions.generation import generate_distribution_values, generate_full_distribution, \
+    generate_outliers_values
+from distributions.models import Distribution
+
+def test_generated_shapes_match_reference():
+    distributions_df = pd.read_csv("data/distributions.csv", sep=";")
+    outliers_df = pd.read_csv("data/outliers.csv", sep=";", decimal=",")
+    for shape in Distribution.DISTRIBUTION_SHAPES:
+        values = generate_distribution_values(shape, 100000, seed=0)
+        assert 0 <= values.min() and values.max() <= 1
+        assert np.allclose([values.mean(), values.std()], [distributions_df[shape].mean(), distributions_df[shape].std()],
+                           atol=0.01)
+    for shape in Distribution.OUTLIERS_SHAPES:
+        values = generate_outliers_values(shape, 100000, seed=0)
+        assert outliers_df[shape].min() - 0.1 < values.min() and values.max() < outliers_df[shape].max() + 0.1
+        assert np.isclose(values.std(), outliers_df[shape].std(), rtol=0.05)
+
+def test_generate_full_distribution():
+    distribution = generate_full_distribution("bimodal", 5000, "outlier_2_side_centered_close", 0.4, seed=0)
+    assert distribution["Type"].value_counts().to_dict() == {"Valid data points": 5000, "Outliers": 3333}
+    same_distribution = generate_full_distribution("bimodal", 5000, "outlier_2_side_centered_close", 0.4, seed=0)
+    assert distribution.equals(same_distribution)
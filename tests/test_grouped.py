@@ -0,0 +1,31 @@
+import numpy as np
+from distributions.batch import get_stats_matrix
+from distributions.core import get_formula_threshold
+from distributions.grouped import get_grouped_stats, get_grouped_thresholds
+from distributions.models import Formula
+
+def test_grouped_stats():
+    rng = np.random.default_rng(0)
+    values, groups = rng.gamma(2, size=3000), rng.choice(["a", "b", "c", "d"], 3000)
+    values[::11] = np.nan
+    keys, stats, counts = get_grouped_stats(values, groups)
+    assert keys.tolist() == ["a", "b", "c", "d"]
+    for key, group_stats, count in zip(keys, stats, counts):
+        group_values = values[(groups == key) & ~np.isnan(values)]
+        assert count == group_values.size
+        assert np.allclose(group_stats, get_stats_matrix(group_values[np.newaxis], axis=1)[0])
+
+def test_grouped_thresholds():
+    rng = np.random.default_rng(1)
+    values, groups = rng.normal(size=20000), rng.integers(0, 2000, 20000)
+    formula = Formula(mad_weight=0.5, mad_constant=2.5, iqr_weight=0.5, iqr_constant=1.5)
+    thresholds = get_grouped_thresholds(np.append(values, [7., np.nan]), np.append(groups, [-1, -2]), formula)
+    assert len(thresholds) == 2001 and thresholds["count"].sum() == 20001
+    # A group of a single value has thresholds even though its SD is NaN
+    assert thresholds.iloc[0].tolist() == [-1, 1, 7., 7., 0, 0.]
+    for key in [0, 500, 1999]:
+        group_values = values[groups == key]
+        row = thresholds[thresholds["group"] == key].iloc[0]
+        thresh_down, thresh_up = get_formula_threshold(group_values, formula)
+        assert np.allclose([row["thresh_down"], row["thresh_up"]], [thresh_down, thresh_up])
+        assert row["outliers"] == ((group_values < thresh_down) | (group_values > thresh_up)).sum()
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from distributions.ingestion import get_column_values, get_numeric_columns, read_table_bytes, sniff_csv_dialect
+
+def test_sniff_csv_dialect():
+    assert sniff_csv_dialect(open("data/outliers.csv", "rb").read()) == (";", ",")
+    assert sniff_csv_dialect(open("data/distributions.csv", "rb").read()) == (";", ".")
+    assert sniff_csv_dialect(b"a\tb\n1.5\t2\n3\t4\n") == ("\t", ".")
+
+def test_read_table_bytes(tmp_path):
+    df = pd.DataFrame({"name": ["a", "b", "c"], "value": [1.5, np.nan, 3.], "count": [1, 2, 3]})
+    df.to_parquet(tmp_path / "table.parquet")
+    df.to_feather(tmp_path / "table.feather")
+    df.to_csv(tmp_path / "table.csv", sep=";", decimal=",", index=False)
+    for name in ["table.parquet", "table.feather", "table.csv"]:
+        table = read_table_bytes((tmp_path / name).read_bytes(), name)
+        assert get_numeric_columns(table) == ["value", "count"]
+        np.testing.assert_array_equal(get_column_values(table, "value"), df["value"])
+        assert get_column_values(table, "count").dtype == float
+
+def test_get_column_values_zero_copy():
+    table = read_table_bytes(open("data/outliers.csv", "rb").read(), "outliers.csv")
+    values = get_column_values(table, "outlier_1_side_centered_extreme")
+    assert not values.flags.writeable and values[0] == 9.7502
@@ -0,0 +1,45 @@
+import threading
+import numpy as np
+import pytest
+from distributions import jobs
+from distributions.jobs import JobCancelled, JobManager, make_job_key
+from distributions.models import Formula
+
+def wait_for(event, progress):
+    progress(0.1, "Waiting")
+    event.wait(5)
+    progress(0.9, "Finishing")
+    return 42
+
+def test_job_deduplication_and_cancellation():
+    manager = JobManager(max_workers=2)
+    started = threading.Event()
+    job = manager.submit("session_1", "key", wait_for, started)
+    assert manager.submit("session_2", "key", wait_for, started) is job
+    assert job.sessions == {"session_1", "session_2"}
+
+    # The job is cancelled once no session follows it anymore
+    manager.release("session_1")
+    assert not job.cancelled
+    other_job = manager.submit("session_2", "other key", wait_for, started)
+    assert job.cancelled and other_job is not job
+    started.set()
+    with pytest.raises(JobCancelled):
+        job.result(timeout=5)
+    assert other_job.result(timeout=5) == 42 and other_job.progress == 1
+
+def test_make_job_key():
+    data = np.arange(10.)
+    formula = Formula(mad_weight=1, mad_constant=2.5)
+    assert make_job_key("a", data, formula) == make_job_key("a", data.copy(), Formula(mad_weight=1, mad_constant=2.5))
+    assert make_job_key("a", data, formula) != make_job_key("a", data + 1, formula)
+    assert make_job_key("a", data, formula) != make_job_key("a", data, Formula(mad_weight=1, mad_constant=3))
+
+def test_finished_jobs_expire(monkeypatch):
+    manager = JobManager(max_workers=1)
+    done = threading.Event()
+    done.set()
+    job = manager.submit("session", "key", wait_for, done)
+    assert job.result(timeout=5) == 42 and manager.get("session") is job
+    monkeypatch.setattr(jobs, "FINISHED_JOB_TTL", 0.)
+    assert manager.get("session") is None
@@ -0,0 +1,9 @@
+import numpy as np
+from scipy.stats import gaussian_kde
+from distributions.kde import get_binned_kde
+
+def test_binned_kde_matches_exact_kde():
+    data = np.random.default_rng(0).gamma(2, size=5000)
+    grid, density = get_binned_kde(data)
+    assert np.allclose(density, gaussian_kde(data)(grid), atol=1e-3)
+    assert np.isclose(np.trapezoid(density, grid), 1, atol=1e-3)
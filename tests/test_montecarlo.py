@@ -0,0 +1,18 @@
+from distributions.models import Formula
+from distributions.montecarlo import run_formula_benchmark
+
+def test_formula_benchmark():
+    formulas = [Formula(sd_weight=1, sd_constant=3), Formula(iqr_weight=1, iqr_constant=1.5)]
+    parameters = dict(distribution_shapes=['normal'], outliers_shapes=['outlier_1_side_centered_extreme'],
+                      outliers_rates=[0.1], distribution_sizes=[100, 500], replicates=50, seed=0)
+    results = run_formula_benchmark(formulas, workers=1, **parameters)
+    assert len(results) == 4
+    assert results[['precision', 'recall', 'f1']].stack().between(0, 1).all()
+    assert results.equals(run_formula_benchmark(formulas, workers=2, **parameters))
+
+def test_formula_benchmark_generated():
+    formulas = [Formula(mad_weight=1, mad_constant=2.5)]
+    results = run_formula_benchmark(formulas, distribution_shapes=['normal'],
+                                    outliers_shapes=['outlier_2_side_dispersed_close'], outliers_rates=[0.1],
+                                    distribution_sizes=[1000, 5000], replicates=20, seed=0, workers=1, generated=True)
+    assert len(results) == 2 and results[['precision', 'recall', 'f1']].stack().between(0, 1).all()
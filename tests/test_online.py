@@ -0,0 +1,17 @@
+import numpy as np
+from distributions.core import get_formula_threshold
+from distributions.models import Formula
+from distributions.online import OnlineOutlierDetector
+
+def test_online_detector_merge():
+    data = np.random.default_rng(0).normal(size=60000)
+    formula = Formula(iqr_weight=0.5, iqr_constant=1.5, sd_weight=0.5, sd_constant=3)
+    workers = [OnlineOutlierDetector(formula, seed=seed) for seed in range(3)]
+    for i, batch in enumerate(np.array_split(data, 30)):
+        workers[i % 3].update(batch)
+    detector = OnlineOutlierDetector.deserialize(workers[0].serialize())
+    for worker in workers[1:]:
+        detector.merge(OnlineOutlierDetector.deserialize(worker.serialize()))
+    assert detector.count == data.size
+    assert np.allclose(detector.threshold(), get_formula_threshold(data, formula), atol=0.05)
+    assert detector.score([0., 10., -10.]).tolist() == [False, True, True]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+import reference
+from distributions.batch import get_thresholds_batch
+from distributions.core import calculate_sd, get_formula_threshold
+from distributions.models import Formula
+from distributions.parallel import get_thresholds_parallel
+from distributions.rolling import get_rolling_threshold
+
+FORMULAS = [Formula(mad_weight=1, mad_constant=2.5), Formula(iqr_weight=1, iqr_constant=1.5),
+            Formula(sd_weight=1, sd_constant=3), Formula(adjusted_mad_weight=1, adjusted_mad_constant=2.5),
+            Formula(mad_weight=0.25, iqr_weight=0.25, sd_weight=0.25, adjusted_mad_weight=0.25, mad_constant=2,
+                    iqr_constant=1, sd_constant=2.5, adjusted_mad_constant=3)]
+KINDS = ['normal', 'skewed', 'nan']
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+@pytest.mark.parametrize('kind', KINDS)
+@pytest.mark.parametrize('size', [2, 11, 1000, 10001])
+def test_threshold_matches_reference(kind, size):
+    data = reference.make_data(kind, size)
+    valid_data = data[~np.isnan(data)]
+    for formula in FORMULAS:
+        np.testing.assert_array_equal(get_formula_threshold(data, formula),
+                                      reference.get_formula_threshold(valid_data, formula))
+    np.testing.assert_array_equal(calculate_sd(valid_data), reference.calculate_sd(valid_data))
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_batch_and_parallel_match_reference(kind):
+    df = pd.DataFrame({column: reference.make_data(kind, 2000, seed=column) for column in range(4)})
+    expected = np.array([[reference.get_formula_threshold(df[column].dropna().to_numpy(), formula)
+                          for formula in FORMULAS] for column in df.columns])
+    assert np.allclose(get_thresholds_batch(df, FORMULAS), expected)
+    for i, formula in enumerate(FORMULAS):
+        assert np.array_equal(get_thresholds_parallel(df, formula, workers=1), expected[:, i])
+
+
+def test_rolling_matches_reference():
+    data = reference.make_data('skewed', 500)
+    for formula in FORMULAS:
+        bands = get_rolling_threshold(data, 50, formula)[['thresh_down', 'thresh_up']].to_numpy()
+        expected = [reference.get_formula_threshold(data[row - 49:row + 1], formula) for row in range(49, 500, 50)]
+        assert np.allclose(bands[49::50], expected)
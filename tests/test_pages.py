@@ -0,0 +1,14 @@
+from streamlit.testing.v1 import AppTest
+
+def test_visualization_without_upload():
+    app = AppTest.from_file("../pages/Visualization.py", default_timeout=60).run()
+    assert not app.exception and not app.error
+
+def test_simulation_job():
+    app = AppTest.from_file("../pages/Simulation.py", default_timeout=60).run()
+    app.button[0].click().run()
+    for _ in range(100):
+        app.run()
+        if app.metric:
+            break
+    assert not app.exception and not app.error and len(app.metric) == 3
@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+from distributions.models import Formula
+from distributions.parallel import get_thresholds_parallel
+
+def test_parallel_matches_serial():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(1000, 5)))
+    df.iloc[::9, 2] = np.nan
+    formula = Formula(mad_weight=0.5, mad_constant=2.5, sd_weight=0.5, sd_constant=3)
+    serial = get_thresholds_parallel(df, formula, workers=1)
+    parallel = get_thresholds_parallel(df, formula, workers=2, min_size=0)
+    assert serial.shape == (5, 2)
+    assert np.array_equal(serial, parallel, equal_nan=True)
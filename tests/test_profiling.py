@@ -0,0 +1,45 @@
+import json
+import threading
+import tracemalloc
+import numpy as np
+from distributions.profiling import Profiler, stage, timed
+
+@timed('allocate')
+def allocate(size):
+    return np.ones(size)
+
+def test_profiler_stages(tmp_path):
+    with stage('ignored'):
+        allocate(10)
+    with Profiler(trace_memory=True) as profiler:
+        with stage('outer'):
+            allocate(1_000_000)
+    assert [record['stage'] for record in profiler.records] == ['allocate', 'outer']
+    inner, outer = profiler.records
+    assert inner['peak_bytes'] >= 8_000_000 and outer['peak_bytes'] >= inner['peak_bytes']
+    assert outer['seconds'] >= inner['seconds']
+
+    path = tmp_path / 'timings.jsonl'
+    profiler.export_jsonl(str(path), page='Test')
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['page'] for record in records] == ['Test', 'Test']
+
+def test_profilers_share_memory_tracing():
+    entered, exit_first = threading.Event(), threading.Event()
+
+    def run_first():
+        with Profiler(trace_memory=True):
+            entered.set()
+            exit_first.wait(5)
+
+    first = threading.Thread(target=run_first)
+    first.start()
+    entered.wait(5)
+    with Profiler(trace_memory=True) as second:
+        # The profiler of the other thread exits while a stage is open, tracing goes on until the last one exits
+        with stage('inner'):
+            exit_first.set()
+            first.join(5)
+            allocate(1_000_000)
+    assert second.records[-1]['peak_bytes'] >= 8_000_000
+    assert not tracemalloc.is_tracing()
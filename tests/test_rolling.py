@@ -0,0 +1,22 @@
+import numpy as np
+from distributions.core import get_formula_threshold
+from distributions.models import Formula
+from distributions.rolling import get_rolling_threshold
+
+def test_rolling_threshold_matches_window_threshold():
+    data = np.cumsum(np.random.default_rng(0).normal(size=300))
+    data[200] = np.nan
+    formula = Formula(mad_weight=0.5, mad_constant=2.5, iqr_weight=0.25, iqr_constant=1.5, sd_weight=0.25,
+                      sd_constant=3)
+    bands = get_rolling_threshold(data, 20, formula)
+    assert bands.iloc[:19].isna()[['thresh_down', 'thresh_up']].all().all()
+    assert bands.iloc[200:220]['thresh_down'].isna().all()
+    for row in (19, 150, 299):
+        assert np.allclose(bands.iloc[row][['thresh_down', 'thresh_up']].to_numpy(dtype=float),
+                           get_formula_threshold(data[row - 19:row + 1], formula))
+
+def test_rolling_threshold_progress():
+    data = np.random.default_rng(0).normal(size=100_000)
+    fractions = []
+    get_rolling_threshold(data, 100, Formula(mad_weight=1, mad_constant=2.5), progress=fractions.append)
+    assert fractions == sorted(fractions) and len(fractions) > 10 and fractions[-1] == 1
@@ -0,0 +1,18 @@
+import numpy as np
+from distributions.core import get_formula_threshold, score_outliers
+from distributions.models import Formula
+from distributions.sorted_column import SortedColumn
+
+def test_sorted_column():
+    data = np.random.default_rng(0).standard_t(3, size=20000)
+    data[::9] = np.nan
+    column = SortedColumn(data)
+    assert column.size == np.count_nonzero(~np.isnan(data))
+    np.testing.assert_array_equal(column.counts, np.histogram(data[~np.isnan(data)], column.edges)[0])
+    for formula in [Formula(mad_weight=1, mad_constant=2.5), Formula(iqr_weight=0.5, iqr_constant=1.5, sd_weight=0.5,
+                                                                     sd_constant=3)]:
+        threshold = column.threshold(formula)
+        assert threshold == get_formula_threshold(data, formula)
+        score = score_outliers(data, *threshold)
+        assert column.count_outliers(*threshold) == (score.count_down, score.count_up)
+    assert SortedColumn([]).count_outliers(np.nan, np.nan) == (0, 0)
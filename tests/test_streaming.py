@@ -0,0 +1,30 @@
+import io
+import numpy as np
+import pandas as pd
+from distributions.models import Formula
+from distributions.streaming import QuantileSketch, RunningMoments, get_streaming_threshold
+
+def test_running_moments():
+    data = np.random.default_rng(0).normal(size=10000)
+    moments = RunningMoments()
+    for chunk in np.array_split(data, 7):
+        moments.update(chunk)
+    assert np.isclose(moments.mean, np.mean(data))
+    assert np.isclose(moments.sd, np.std(data, ddof=1))
+
+def test_quantile_sketch_merge():
+    data = np.random.default_rng(0).uniform(size=100000)
+    sketch, other = QuantileSketch(seed=0), QuantileSketch(seed=1)
+    sketch.update(data[:50000])
+    other.update(data[50000:])
+    sketch.merge(other)
+    assert sketch.count == data.size
+    assert abs(sketch.quantile(0.5) - 0.5) < 0.02
+
+def test_streaming_threshold_progress():
+    data = pd.DataFrame({"values": np.random.default_rng(0).normal(size=10000)})
+    file = io.BytesIO(data.to_csv(index=False).encode())
+    fractions = []
+    get_streaming_threshold(file, "values", Formula(sd_weight=1, sd_constant=3), chunksize=2500,
+                            progress=fractions.append)
+    assert fractions == sorted(fractions) and len(fractions) == 4 and fractions[-1] == 1